@@ -0,0 +1,126 @@
+import argparse
+import heapq
+import pandas as pd
+
+from data_loader import load_results
+from ingest import normalise_email
+from what_if import load_applicants, score_cohort
+
+# --- Configuration ---
+# Only these decisions compete for funded awards; each award costs what its type costs
+AWARD_DECISIONS = ('Full Scholarship', 'Partial Scholarship')
+DEFAULT_AWARD_COSTS = {'Full Scholarship': 20000.0, 'Partial Scholarship': 8000.0}
+
+
+def _ranking_key(row):
+    """Higher composite score first, then higher special-factor score, then email for a stable order"""
+    email, composite, special = row[1], row[2], row[3]
+    return (-composite, -special, str(email).lower())
+
+
+def award_candidates(results, scored):
+    """Official decisions from the results file, with the simulator's scores for ranking.
+
+    Decision always comes from scholarship_results.csv, so only applicants the results
+    and letters call Full/Partial Scholarship can be funded. The re-scored cohort only
+    supplies Composite_Score and Special_Score, joined on normalised email; an awardee
+    missing from the responses keeps scores of 0 and ranks last.
+    """
+    official = results[['Email', 'Decision']].assign(Key=results['Email'].astype(str).map(normalise_email))
+    official = official[official['Decision'].isin(AWARD_DECISIONS)]
+    official = official[official['Key'] != ''].drop_duplicates('Key', keep='last')
+
+    scores = scored[['Composite_Score', 'Special_Score']].assign(
+        Key=scored['Email'].astype(str).map(normalise_email))
+    scores = scores.drop_duplicates('Key', keep='last').set_index('Key')
+
+    candidates = official.join(scores, on='Key')
+    candidates[['Composite_Score', 'Special_Score']] = candidates[['Composite_Score', 'Special_Score']].fillna(0.0)
+    candidates['Decision'] = candidates['Decision'].astype(str)
+    return candidates.drop(columns='Key')
+
+
+def allocate_awards(scored, budget, award_costs=None, waitlist_size=20):
+    """Fund the best-ranked qualifying applicants until the budget runs out.
+
+    Only the top k candidates are ever ordered (heapq.nsmallest, O(n log k)), where k is
+    the most awards the budget could pay for plus the waitlist. Candidates are walked in
+    rank order: an award is funded if it still fits the remaining budget, otherwise the
+    candidate goes on the waitlist. scored needs Email, Decision, Composite_Score and
+    Special_Score columns (see award_candidates). Returns (funded, waitlist) DataFrames.
+    """
+    award_costs = {**DEFAULT_AWARD_COSTS, **(award_costs or {})}
+    candidates = scored[scored['Decision'].isin(AWARD_DECISIONS)]
+    rows = list(zip(candidates.index, candidates['Email'], candidates['Composite_Score'],
+                    candidates['Special_Score'], candidates['Decision']))
+
+    cheapest = min(award_costs[d] for d in AWARD_DECISIONS)
+    max_awards = int(budget // cheapest) if cheapest > 0 else len(rows)
+    k = min(len(rows), max_awards + waitlist_size)
+
+    while True:
+        ranked = heapq.nsmallest(k, rows, key=_ranking_key)
+        remaining = float(budget)
+        funded, waitlist = [], []
+        for rank, (index, email, composite, special, decision) in enumerate(ranked, start=1):
+            cost = award_costs[decision]
+            record = {'Rank': rank, 'Email': email, 'Decision': decision, 'Cost': cost,
+                      'Composite_Score': composite, 'Special_Score': special}
+            if cost <= remaining:
+                remaining -= cost
+                record['Remaining_Budget'] = remaining
+                funded.append(record)
+            elif len(waitlist) < waitlist_size:
+                waitlist.append(record)
+
+        # A skipped expensive award can leave room for cheaper candidates beyond the top k
+        if k >= len(rows) or remaining < cheapest:
+            break
+        k = min(len(rows), k * 2)
+
+    funded_df = pd.DataFrame(funded, columns=['Rank', 'Email', 'Decision', 'Cost', 'Composite_Score',
+                                              'Special_Score', 'Remaining_Budget'])
+    waitlist_df = pd.DataFrame(waitlist, columns=['Rank', 'Email', 'Decision', 'Cost', 'Composite_Score',
+                                                  'Special_Score'])
+    return funded_df, waitlist_df
+
+
+def allocation_summary(funded, waitlist, budget):
+    spent = float(funded['Cost'].sum())
+    lines = ["💰 AWARD ALLOCATION", "=" * 40,
+             f"Budget: RM{budget:,.2f}",
+             f"Allocated: RM{spent:,.2f}  (remaining RM{budget - spent:,.2f})", ""]
+    for decision in AWARD_DECISIONS:
+        lines.append(f"{decision:<25}: {int((funded['Decision'] == decision).sum())} funded")
+    lines.append(f"{'Waitlist':<25}: {len(waitlist)}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Allocate funded awards under a budget")
+    parser.add_argument('responses', nargs='?', default='student_responses.csv')
+    parser.add_argument('--results', default='scholarship_results.csv',
+                        help="official decisions; only its awardees are funded")
+    parser.add_argument('--budget', type=float, required=True)
+    parser.add_argument('--full-cost', type=float, default=DEFAULT_AWARD_COSTS['Full Scholarship'])
+    parser.add_argument('--partial-cost', type=float, default=DEFAULT_AWARD_COSTS['Partial Scholarship'])
+    parser.add_argument('--waitlist', type=int, default=20)
+    parser.add_argument('--funded-out', default='scholarship_awards.csv')
+    parser.add_argument('--waitlist-out', default='scholarship_waitlist.csv')
+    args = parser.parse_args()
+
+    candidates = award_candidates(load_results(args.results), score_cohort(load_applicants(args.responses)))
+    funded, waitlist = allocate_awards(
+        candidates, args.budget,
+        {'Full Scholarship': args.full_cost, 'Partial Scholarship': args.partial_cost},
+        args.waitlist)
+    funded.to_csv(args.funded_out, index=False, encoding='utf-8')
+    waitlist.to_csv(args.waitlist_out, index=False, encoding='utf-8')
+
+    print('\n'.join(allocation_summary(funded, waitlist, args.budget)))
+    print(f"\nFunded list saved to: {args.funded_out}")
+    print(f"Waitlist saved to: {args.waitlist_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+import os
+import shutil
+
+# --- Configuration ---
+CHECKPOINT_DIRNAME = "checkpoint"
+CHECKPOINT_FILENAME = "checkpoint.txt"
+CHUNK_SIZE = 500   # applicants per committed part file
+RESULTS_HEADER = "StudentID,Email,Decision,Confidence,Explanation\n"   # as write_results_header/1
+
+
+def part_path(checkpoint_dir, part):
+    """Same name as part_file/3 in scholarship_rules.pl"""
+    return os.path.join(checkpoint_dir, f"part_{part}.csv")
+
+
+def read_checkpoint(checkpoint_dir):
+    """{'key', 'last_index', 'parts', 'complete'} from the checkpoint file, or None.
+
+    The file is written by write_checkpoint/5 in scholarship_rules.pl, always by
+    renaming a finished temporary file over it, so it is never half written.
+    """
+    try:
+        with open(os.path.join(checkpoint_dir, CHECKPOINT_FILENAME), encoding='utf-8') as f:
+            fields = dict(line.rstrip('\n').split('=', 1) for line in f if '=' in line)
+        return {'key': fields['key'], 'last_index': int(fields['last_index']),
+                'parts': int(fields['parts']), 'complete': fields.get('complete') == 'true'}
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def resume_point(checkpoint_dir, key):
+    """(applicants already saved, parts already saved) for a run with this input key.
+
+    A checkpoint left by a run over different inputs is discarded, so a run only ever
+    resumes work done on exactly the same responses, rules and settings.
+    """
+    checkpoint = read_checkpoint(checkpoint_dir)
+    if checkpoint is not None and checkpoint['key'] == key:
+        return checkpoint['last_index'], checkpoint['parts']
+    clear_checkpoint(checkpoint_dir)
+    os.makedirs(checkpoint_dir, exist_ok=True)
+    return 0, 0
+
+
+def merge_parts(checkpoint_dir, parts, results_path):
+    """Concatenate the committed parts into the results file, replacing it atomically"""
+    temp_path = results_path + ".tmp"
+    with open(temp_path, 'wb') as out:
+        out.write(RESULTS_HEADER.encode('utf-8'))
+        for part in range(1, parts + 1):
+            with open(part_path(checkpoint_dir, part), 'rb') as f:
+                shutil.copyfileobj(f, out)
+    os.replace(temp_path, results_path)
+
+
+def clear_checkpoint(checkpoint_dir):
+    shutil.rmtree(checkpoint_dir, ignore_errors=True)
@@ -0,0 +1,84 @@
+import functools
+import os
+import re
+
+from data_loader import load_responses, read_csv_fast
+from ingest import EMAIL_COLUMN, normalise_email
+
+# --- Configuration ---
+EXPLANATION_CACHE_SIZE = 256   # rendered explanations kept (least recently used are dropped)
+
+# Form answers quoted in the full explanation (0-based columns, as in process_csv_row/2)
+DETAIL_COLUMNS = {'cgpa': 24, 'credit_hours': 25, 'household_income': 28, 'dependents': 29,
+                  'activity_level': 32, 'leadership_positions': 33}
+
+# What a deferred-mode batch run writes (write_compact_explanation/2 in scholarship_rules.pl)
+COMPACT_PATTERN = re.compile(r'^Academic: (\w+) \| Financial: (\w+) \| Income: (\w+) '
+                             r'\| Activities: (\w+) \| Special Factors: (.*)$')
+
+# Same text as generate_success_explanation/7
+FULL_TEMPLATE = ('Academic: {academic} (CGPA: {cgpa}, Credits: {credit_hours}) | '
+                 'Financial: {financial} (Income: {household_income}, Dependents: {dependents}) | '
+                 'Activities: {activities} (Activity: {activity_level}, Leadership: {leadership_positions}) | '
+                 'Special Factors: {special}')
+
+
+def is_compact(explanation):
+    return isinstance(explanation, str) and COMPACT_PATTERN.match(explanation) is not None
+
+
+def details_path_for(results_path):
+    """scholarship_results.csv -> scholarship_results_details.csv"""
+    root, ext = os.path.splitext(results_path)
+    return f"{root}_details{ext or '.csv'}"
+
+
+def write_explanation_details(responses_path, out_path):
+    """Snapshot of the answers quoted in the explanations, from the responses a run evaluated.
+
+    responses_path is the de-duplicated copy handed to Prolog, so the snapshot matches
+    the results exactly even after the live export or the duplicate policy changes.
+    """
+    raw = load_responses(responses_path)
+    details = raw.iloc[:, list(DETAIL_COLUMNS.values())].copy()
+    details.columns = list(DETAIL_COLUMNS)
+    details.insert(0, 'Email', raw.iloc[:, EMAIL_COLUMN].map(normalise_email))
+    details = details[details['Email'] != ''].drop_duplicates('Email', keep='last')
+    details.to_csv(out_path, index=False, encoding='utf-8')
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+@functools.lru_cache(maxsize=4)
+def _response_details(details_path, signature):
+    """normalised email -> answers quoted in the explanation, for the rows Prolog evaluated"""
+    details = read_csv_fast(details_path, all_strings=True)
+    answers = details[list(DETAIL_COLUMNS)]
+    return {email: dict(zip(DETAIL_COLUMNS, row))
+            for email, row in zip(details['Email'], answers.itertuples(index=False, name=None))}
+
+
+@functools.lru_cache(maxsize=EXPLANATION_CACHE_SIZE)
+def _render(explanation, email, details_path, signature):
+    details = _response_details(details_path, signature).get(email)
+    if details is None:
+        return explanation
+    academic, financial, _, activities, special = COMPACT_PATTERN.match(explanation).groups()
+    return FULL_TEMPLATE.format(academic=academic, financial=financial, activities=activities,
+                                special=special, **details)
+
+
+def full_explanation(explanation, email, results_path):
+    """Full explanation text for one applicant, built only when it is opened.
+
+    Deferred-mode results carry just the tiers; the quoted answers are looked up by
+    email in the details snapshot the same run saved next to results_path. Full
+    explanations, and any applicant that cannot be found, are returned unchanged.
+    """
+    details_path = details_path_for(results_path)
+    if not is_compact(explanation) or not os.path.exists(details_path):
+        return explanation
+    return _render(explanation, normalise_email(email), details_path, _signature(details_path))
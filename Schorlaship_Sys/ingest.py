@@ -0,0 +1,96 @@
+import os
+import pandas as pd
+
+from data_loader import load_responses
+
+# --- Configuration ---
+# Column positions in the Microsoft Forms export (0-based)
+COMPLETION_TIME_COLUMN = 2
+EMAIL_COLUMN = 3
+COMPLETION_TIME_FORMAT = '%m/%d/%Y %H:%M'
+
+# 'latest': keep only the most recent submission per email
+# 'flag':   hold back every submission of a duplicated email for manual review
+DUPLICATE_POLICIES = ('latest', 'flag')
+
+
+def normalise_email(email):
+    return str(email).strip().lower()
+
+
+def deduplicate_responses(raw, policy='latest'):
+    """Collapse repeated submissions keyed on normalised email in a single pass.
+
+    Returns (kept rows, report). The report holds the number of rows read, kept and
+    collapsed, plus the duplicate submissions themselves for the review file.
+    Rows without an email are kept as they are.
+    """
+    if policy not in DUPLICATE_POLICIES:
+        raise ValueError(f"Unknown duplicate policy '{policy}' (expected one of {', '.join(DUPLICATE_POLICIES)})")
+
+    emails = raw.iloc[:, EMAIL_COLUMN].map(normalise_email).to_numpy()
+    # As int64 an unparsable time (NaT) is the smallest value, so it never beats a real one
+    completed = pd.to_datetime(raw.iloc[:, COMPLETION_TIME_COLUMN], format=COMPLETION_TIME_FORMAT,
+                               errors='coerce').to_numpy(dtype='datetime64[ns]').view('int64')
+
+    # email -> (position of the submission kept so far, number of submissions seen)
+    seen = {}
+    for position, email in enumerate(emails):
+        if not email:
+            continue
+        if email not in seen:
+            seen[email] = (position, 1)
+            continue
+        kept, count = seen[email]
+        # Later completion time wins; equal times fall back to file order
+        if completed[position] >= completed[kept]:
+            kept = position
+        seen[email] = (kept, count + 1)
+
+    duplicated = {email for email, (_, count) in seen.items() if count > 1}
+    is_duplicate = pd.Series(emails).isin(duplicated).to_numpy()
+
+    if policy == 'latest':
+        keep_positions = {kept for kept, _ in seen.values()}
+        keep = [not email or position in keep_positions for position, email in enumerate(emails)]
+    else:
+        keep = list(~is_duplicate)
+
+    kept_rows = raw[keep]
+    report = {
+        'policy': policy,
+        'total': len(raw),
+        'kept': len(kept_rows),
+        'collapsed': len(raw) - len(kept_rows),
+        'duplicate_emails': len(duplicated),
+        'duplicates': raw[is_duplicate],
+    }
+    return kept_rows, report
+
+
+def prepare_responses(responses_path, output_path, policy='latest', review_path=None):
+    """Write a de-duplicated copy of the responses file for the Prolog engine.
+
+    The copy keeps the original column layout so process_csv_row/2 reads it exactly like
+    the original export, but is always written as UTF-8 (import_students_from_csv/1
+    reads it with encoding(utf8)). Duplicate submissions are written to review_path
+    when given.
+    """
+    raw = load_responses(responses_path)
+    kept_rows, report = deduplicate_responses(raw, policy)
+    kept_rows.to_csv(output_path, index=False, encoding='utf-8')
+
+    if review_path:
+        if len(report['duplicates']):
+            report['duplicates'].to_csv(review_path, index=False, encoding='utf-8')
+        elif os.path.exists(review_path):
+            os.remove(review_path)
+    return report
+
+
+def describe_report(report):
+    """One-line summary for the officer output"""
+    action = 'collapsed' if report['policy'] == 'latest' else 'held for review'
+    return (f"🧹 Duplicate check ({report['policy']}): {report['total']} submissions, "
+            f"{report['duplicate_emails']} emails submitted more than once, "
+            f"{report['collapsed']} submissions {action}, {report['kept']} evaluated")
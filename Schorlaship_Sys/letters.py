@@ -0,0 +1,351 @@
+import argparse
+import collections
+import html
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from data_loader import load_results
+from ingest import normalise_email
+
+# --- Configuration ---
+LETTER_CHUNK_SIZE = 500   # letters rendered per worker task
+CHUNKS_IN_FLIGHT_PER_WORKER = 2   # rendered-but-unwritten chunks are bounded by this x workers
+LETTER_FORMATS = ('html', 'txt')
+
+# Styles shared by the Student Portal text widget and the HTML letters
+LETTER_STYLES = {
+    'header': {'size': 14, 'bold': True, 'colour': '#2c3e50'},
+    'label': {'size': 11, 'bold': True, 'colour': '#34495e'},
+    'success': {'size': 12, 'bold': True, 'colour': '#27ae60'},
+    'partial': {'size': 12, 'bold': True, 'colour': '#f39c12'},
+    'priority': {'size': 12, 'bold': True, 'colour': '#e67e22'},
+    'reject': {'size': 12, 'bold': True, 'colour': '#e74c3c'},
+    'success_msg': {'colour': '#27ae60'},
+    'partial_msg': {'colour': '#f39c12'},
+    'priority_msg': {'colour': '#e67e22'},
+    'reject_msg': {'colour': '#e74c3c'},
+}
+
+FRIENDLY_TIERS = {
+    'tier1': 'Excellent', 'tier2': 'Good',
+    'tier3': 'Average', 'tier4': 'Below Average'
+}
+FRIENDLY_FINANCIAL = {
+    'urgent': 'Critical Need', 'high': 'High Need',
+    'medium': 'Moderate Need', 'low': 'Low Need',
+    'minimal': 'Minimal Need'
+}
+FRIENDLY_ACTIVITIES = {
+    'outstanding': 'Outstanding', 'strong': 'Strong',
+    'moderate': 'Moderate', 'basic': 'Basic',
+    'poor': 'Limited'
+}
+
+# (marker in the decision, emoji, style) - checked in order
+DECISION_BADGES = [
+    ('Full Scholarship', '🟢', 'success'),
+    ('Partial Scholarship', '🟡', 'partial'),
+    ('Priority Candidate', '🟠', 'priority'),
+    ('Not Eligible', '🔴', 'reject'),
+]
+
+GUIDANCE_TEMPLATES = {
+    'Full Scholarship': (
+        "🎉 CONGRATULATIONS!\n\n"
+        "You have been awarded a Full Scholarship based on your outstanding application.\n\n"
+        "📅 Next Steps:\n"
+        "• Official offer letter will be sent to your email within 3 working days\n"
+        "• Review and accept the offer through the student portal\n"
+        "• Complete any required documentation\n"
+        "• Contact scholarship office for any questions\n\n"
+        "💡 This scholarship covers tuition fees and provides a living allowance.", 'success_msg'),
+    'Partial Scholarship': (
+        "✅ SCHOLARSHIP AWARDED!\n\n"
+        "You have been selected for a Partial Scholarship.\n\n"
+        "📅 Next Steps:\n"
+        "• Scholarship details will be emailed to you\n"
+        "• Review the terms and coverage amount\n"
+        "• Accept the offer within 14 days\n"
+        "• Consider additional financial aid options if needed\n\n"
+        "💡 Partial scholarships significantly reduce your educational expenses.", 'partial_msg'),
+    'Priority Candidate': (
+        "📋 UNDER SPECIAL CONSIDERATION\n\n"
+        "Your application has been marked for priority review.\n\n"
+        "📅 What to Expect:\n"
+        "• Committee will review your application further\n"
+        "• You may be contacted for additional information\n"
+        "• Final decision within 7-10 working days\n"
+        "• Continue checking your email for updates\n\n"
+        "💡 Your unique circumstances are being carefully considered.", 'priority_msg'),
+}
+
+BASIC_REQUIREMENTS = [
+    "Must be a Malaysian citizen",
+    "Must have no disciplinary record",
+    "Must provide data consent for processing",
+]
+
+FUTURE_OPPORTUNITIES = (
+    "\n🔄 Future Opportunities:\n"
+    "• Apply again next semester with improvements\n"
+    "• Explore other scholarship programs\n"
+    "• Visit Student Affairs for guidance\n"
+    "• Consider part-time campus employment\n\n"
+    "💡 Many successful students apply multiple times.")
+
+
+def _component(explanation, label):
+    """First word of a 'Label: word (...)' part of the explanation, or None.
+
+    Works on full explanations and on the compact ones of deferred batch runs,
+    which leave out the bracketed details.
+    """
+    marker = f'{label}: '
+    if marker not in explanation:
+        return None
+    part = explanation.split(marker)[1].split(' | ')[0]
+    match = re.match(r'(\w+)', part)
+    return match.group(1) if match else None
+
+
+def evaluation_details(explanation):
+    """Student-friendly bullet points for the evaluation breakdown"""
+    details = []
+    try:
+        tier = _component(explanation, 'Academic')
+        if tier:
+            details.append(f"📚 Academic Performance: {FRIENDLY_TIERS.get(tier, tier)}")
+
+        level = _component(explanation, 'Financial')
+        if level:
+            details.append(f"💰 Financial Need: {FRIENDLY_FINANCIAL.get(level, level)}")
+
+        level = _component(explanation, 'Activities')
+        if level:
+            details.append(f"🏆 Co-curricular Activities: {FRIENDLY_ACTIVITIES.get(level, level)}")
+
+        if 'Special Factors:' in explanation:
+            spec_part = explanation.split('Special Factors: ')[1]
+            if spec_part and spec_part != '[]':
+                details.append("🎯 Special Circumstances: Considered in evaluation")
+    except Exception:
+        details = ["Evaluation details available in full report"]
+    return details
+
+
+def improvement_feedback(explanation):
+    """Specific improvement suggestions based on the evaluation"""
+    # Based on the tiers only, so the quoted form answers (e.g. 'Below RM2,560')
+    # cannot trigger a suggestion and compact explanations give the same result
+    academic = _component(explanation, 'Academic')
+    financial = _component(explanation, 'Financial')
+    activities = _component(explanation, 'Activities')
+
+    feedback = []
+    if academic in ('tier3', 'tier4'):
+        feedback.append("Focus on improving your academic performance (aim for CGPA 3.5+)")
+    if financial in ('minimal', 'low'):
+        feedback.append("Limited financial need was a factor in this evaluation")
+    if activities in ('poor', 'basic'):
+        feedback.append("Increase participation in co-curricular activities")
+    if activities == 'moderate':
+        feedback.append("Consider taking on leadership roles in student organizations")
+    if not feedback:
+        feedback.append("Competition was high this semester - consider reapplying")
+    return feedback
+
+
+def guidance_segments(decision, explanation):
+    """Decision-specific guidance as (text, style) segments"""
+    for marker, (text, style) in GUIDANCE_TEMPLATES.items():
+        if marker in decision:
+            return [(text, style)]
+
+    if 'Not Eligible - Basic Requirements' in decision:
+        segments = [("❌ BASIC ELIGIBILITY NOT MET\n\n"
+                     "You do not meet the basic eligibility criteria for this scholarship.\n\n", 'reject_msg'),
+                    ("Basic Eligibility Requirements:\n", 'label')]
+        segments += [(f"• {requirement}\n", None) for requirement in BASIC_REQUIREMENTS]
+        segments.append(("\n💡 Unfortunately, you cannot be considered for this scholarship due to the "
+                         "above requirements.\n", 'reject_msg'))
+        return segments
+
+    if 'Not Eligible' in decision:
+        segments = [("💡 APPLICATION REVIEW COMPLETE\n\n"
+                     "While you meet basic requirements, your application was not selected this time.\n\n"
+                     "📊 Areas for Improvement:\n", 'reject_msg')]
+        segments += [(f"• {item}\n", 'reject_msg') for item in improvement_feedback(explanation)]
+        segments.append((FUTURE_OPPORTUNITIES, 'reject_msg'))
+        return segments
+
+    return []
+
+
+def letter_segments(email, student_id, decision, confidence, explanation):
+    """The whole decision letter as (text, style) segments; style None is plain text.
+
+    This is the single template behind the Student Portal view and the bulk letters.
+    """
+    decision = str(decision)
+    explanation = explanation if isinstance(explanation, str) else ''
+
+    segments = [("🎓 SCHOLARSHIP ELIGIBILITY RESULTS\n", 'header'),
+                ("=" * 50 + "\n\n", None),
+                (f"📧 Email: {email}\n", None),
+                (f"🆔 Student ID: {student_id}\n\n", None),
+                ("DECISION: ", 'label')]
+
+    for marker, emoji, style in DECISION_BADGES:
+        if marker in decision:
+            segments.append((f"{emoji} {decision}\n", style))
+            break
+    else:
+        segments.append((f"{decision}\n", None))
+
+    segments.append((f"\n📊 CONFIDENCE SCORE: {confidence:.2f}/1.00\n\n", 'label'))
+    segments.append(("📋 EVALUATION BREAKDOWN:\n", 'label'))
+    segments.append(("────────────────────────\n", None))
+    segments += [(f"• {detail}\n", None) for detail in evaluation_details(explanation)]
+    segments.append(("\n", None))
+    segments += guidance_segments(decision, explanation)
+    return segments
+
+
+def render_text(segments):
+    return ''.join(text for text, _ in segments)
+
+
+def _css(style):
+    rules = [f"color: {style['colour']};"]
+    if style.get('bold'):
+        rules.append("font-weight: bold;")
+    if style.get('size'):
+        rules.append(f"font-size: {style['size']}pt;")
+    return ' '.join(rules)
+
+
+HTML_STYLESHEET = '\n'.join(f".{name} {{ {_css(style)} }}" for name, style in LETTER_STYLES.items())
+
+
+def render_html(segments, title):
+    body = ''.join(html.escape(text) if style is None else f'<span class="{style}">{html.escape(text)}</span>'
+                   for text, style in segments)
+    return (f"<!DOCTYPE html>\n<html>\n<head>\n<meta charset=\"utf-8\">\n<title>{html.escape(title)}</title>\n"
+            f"<style>\nbody {{ font-family: Arial, sans-serif; font-size: 11pt; white-space: pre-wrap; }}\n"
+            f"{HTML_STYLESHEET}\n</style>\n</head>\n<body>{body}</body>\n</html>\n")
+
+
+def letter_filename(email, student_id):
+    name = str(email).strip() or str(student_id)
+    return re.sub(r'[^\w.@-]', '_', name)
+
+
+def render_letters(rows, formats=LETTER_FORMATS):
+    """Worker task: [(email, student_id, decision, confidence, explanation)] -> [(filename, content)]"""
+    rendered = []
+    for email, student_id, decision, confidence, explanation in rows:
+        segments = letter_segments(email, student_id, decision, confidence, explanation)
+        name = letter_filename(email, student_id)
+        if 'html' in formats:
+            rendered.append((f"{name}.html", render_html(segments, f"Scholarship Decision - {email}")))
+        if 'txt' in formats:
+            rendered.append((f"{name}.txt", render_text(segments)))
+    return rendered
+
+
+def letter_rows(results):
+    """One row per applicant; a repeated email keeps its last (latest) result like the portal does"""
+    results = results.assign(_email=results['Email'].astype(str).map(normalise_email))
+    results = results.drop_duplicates('_email', keep='last')
+    return list(zip(results['Email'].astype(str), results['StudentID'].astype(str),
+                    results['Decision'].astype(str), results['Confidence'].astype(float),
+                    results['Explanation'].astype(object)))
+
+
+def _chunks(rows, size):
+    for start in range(0, len(rows), size):
+        yield rows[start:start + size]
+
+
+class _LetterSink:
+    """Writes letters into a zip archive or a directory as they arrive"""
+
+    def __init__(self, out_path):
+        self.zip = None
+        if out_path.lower().endswith('.zip'):
+            self.zip = zipfile.ZipFile(out_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        else:
+            os.makedirs(out_path, exist_ok=True)
+        self.out_path = out_path
+
+    def write(self, filename, content):
+        if self.zip is not None:
+            self.zip.writestr(filename, content)
+        else:
+            with open(os.path.join(self.out_path, filename), 'w', encoding='utf-8') as f:
+                f.write(content)
+
+    def write_all(self, letters):
+        for filename, content in letters:
+            self.write(filename, content)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+def generate_letters(results_path, out_path, formats=LETTER_FORMATS, workers=None, chunk_size=LETTER_CHUNK_SIZE):
+    """Render a decision letter for every applicant into out_path (.zip or a directory).
+
+    Chunks of applicants are rendered on a process pool and written out in order. Only
+    a fixed window of chunks is submitted at a time and the next one is submitted as
+    each chunk is written, so a slow sink (zip deflate) holds back the workers instead
+    of letting rendered letters pile up in memory. Small cohorts
+    that fit in one chunk, or a single worker, render in-process. Returns the number
+    of letters.
+    """
+    workers = workers or os.cpu_count() or 1
+    rows = letter_rows(load_results(results_path, columns=['StudentID', 'Email', 'Decision', 'Confidence',
+                                                           'Explanation']))
+    sink = _LetterSink(out_path)
+    try:
+        if len(rows) <= chunk_size or workers == 1:
+            for chunk in _chunks(rows, chunk_size):
+                sink.write_all(render_letters(chunk, formats))
+        else:
+            chunks = _chunks(rows, chunk_size)
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                pending = collections.deque()
+                for chunk in chunks:
+                    pending.append(executor.submit(render_letters, chunk, formats))
+                    if len(pending) >= workers * CHUNKS_IN_FLIGHT_PER_WORKER:
+                        break
+                while pending:
+                    sink.write_all(pending.popleft().result())
+                    chunk = next(chunks, None)
+                    if chunk is not None:
+                        pending.append(executor.submit(render_letters, chunk, formats))
+    finally:
+        sink.close()
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a decision letter for every applicant")
+    parser.add_argument('results', nargs='?', default='scholarship_results.csv')
+    parser.add_argument('--out', default='scholarship_letters.zip', help="a .zip file or a directory")
+    parser.add_argument('--format', choices=LETTER_FORMATS, action='append',
+                        help="letter format (repeatable, default: html and txt)")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    started = time.monotonic()
+    count = generate_letters(args.results, args.out, tuple(args.format or LETTER_FORMATS), args.workers)
+    print(f"✉️ {count} letters written to {args.out} in {time.monotonic() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,25 @@ import subprocess
 import tempfile
 import sys
 import re
+import time
+import multiprocessing
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from data_loader import load_results
+from results_cube import add_tier_columns, load_results_cube, decision_summary, cube_crosstab
+from what_if import DEFAULT_PARAMETERS, load_applicants, compare_scenarios, score_cohort
+from allocation import DEFAULT_AWARD_COSTS, allocate_awards, allocation_summary, award_candidates
+from ingest import DUPLICATE_POLICIES, describe_report
+from prolog_runner import (DUPLICATE_REVIEW_FILENAME, PREVIOUS_RESULTS_FILENAME, PROLOG_TIMEOUT,
+                           ProcessingInProgress, run_prolog_batch)
+from results_diff import compare_result_files, describe_change, diff_summary
+from explanations import full_explanation
+from letters import (FRIENDLY_ACTIVITIES, FRIENDLY_FINANCIAL, FRIENDLY_TIERS, LETTER_STYLES,
+                     generate_letters, letter_segments)
 
 class ScholarshipApp:
+    # Number of applicants rendered per page in the detailed results table
+    DETAIL_PAGE_SIZE = 100
+
     def __init__(self, master):
         self.master = master
         master.title("UTP Scholarship Management System")
@@ -28,6 +44,9 @@ class ScholarshipApp:
         self.responses_filepath = tk.StringVar(value=os.path.join(self.script_dir, "student_responses.csv"))
         self.results_filename = os.path.join(self.script_dir, "scholarship_results.csv")
         self.prolog_filename = os.path.join(self.script_dir, "scholarship_rules.pl")
+        self.duplicate_policy = tk.StringVar(value='latest')
+        self.prolog_timeout = tk.StringVar(value=str(PROLOG_TIMEOUT))
+        self.duplicate_review_filename = os.path.join(self.script_dir, DUPLICATE_REVIEW_FILENAME)
         self.data_processed = False
         
         # Create main notebook for different interfaces
@@ -174,9 +193,17 @@ Note: Results are only available after the scholarship officer has processed all
         
         ttk.Button(file_frame, text="Browse", command=self.browse_file).grid(row=0, column=2, padx=5, pady=5)
         
+        ttk.Label(file_frame, text="Duplicate Submissions:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
+        ttk.Combobox(file_frame, textvariable=self.duplicate_policy, values=DUPLICATE_POLICIES,
+                     state='readonly', width=10).grid(row=1, column=1, sticky='w', padx=5, pady=5)
+        
+        ttk.Label(file_frame, text="Prolog Timeout (s):").grid(row=2, column=0, sticky='w', padx=5, pady=5)
+        ttk.Spinbox(file_frame, textvariable=self.prolog_timeout, from_=30, to=3600, increment=30,
+                    width=8).grid(row=2, column=1, sticky='w', padx=5, pady=5)
+        
         # Processing buttons
         process_frame = ttk.Frame(file_frame)
-        process_frame.grid(row=1, column=0, columnspan=3, sticky='ew', pady=10)
+        process_frame.grid(row=3, column=0, columnspan=3, sticky='ew', pady=10)
         
         ttk.Button(process_frame, text="🚀 PROCESS WITH PROLOG AI", 
                   command=self.run_prolog_processing,
@@ -188,6 +215,18 @@ Note: Results are only available after the scholarship officer has processed all
         ttk.Button(process_frame, text="View Enhanced Results", 
                   command=self.display_detailed_enhanced).pack(side=tk.LEFT, padx=5)
         
+        ttk.Button(process_frame, text="🔬 What-If Simulator", 
+                  command=self.open_what_if_simulator).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(process_frame, text="💰 Allocate Awards", 
+                  command=self.open_award_allocation).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(process_frame, text="✉️ Generate Letters", 
+                  command=self.export_decision_letters).pack(side=tk.LEFT, padx=5)
+        
+        ttk.Button(process_frame, text="🔀 Compare Runs", 
+                  command=self.compare_runs).pack(side=tk.LEFT, padx=5)
+        
         file_frame.columnconfigure(1, weight=1)
         
         # Output area
@@ -219,6 +258,32 @@ Note: Results are only available after the scholarship officer has processed all
         ttk.Button(control_frame, text="Refresh Data", 
                   command=self.refresh_visualizations).pack(side=tk.LEFT, padx=5)
         
+        # Drill-down filters - answered from the pre-aggregated results cube
+        filter_frame = ttk.LabelFrame(main_frame, text="Drill-down Filters", padding="10")
+        filter_frame.pack(fill=tk.X, pady=5)
+
+        self.analytics_filters = {}
+        filter_specs = [
+            ("Academic", 'Academic_Tier', ['All', 'tier1', 'tier2', 'tier3', 'tier4']),
+            ("Financial", 'Financial_Level', ['All', 'urgent', 'high', 'medium', 'low', 'minimal']),
+            ("Income", 'Income_Group', ['All', 'B40', 'M40', 'T20']),
+            ("Activities", 'Activity_Level', ['All', 'outstanding', 'strong', 'moderate', 'basic', 'poor']),
+            ("Special", 'Special_Flag', ['All', 'none', 'health_challenge', 'financial_hardship',
+                                         'health_challenge,financial_hardship']),
+        ]
+        for col, (label, dimension, values) in enumerate(filter_specs):
+            ttk.Label(filter_frame, text=f"{label}:").grid(row=0, column=col * 2, sticky='w', padx=5)
+            var = tk.StringVar(value='All')
+            ttk.Combobox(filter_frame, textvariable=var, values=values, state='readonly',
+                         width=12).grid(row=0, column=col * 2 + 1, padx=5)
+            self.analytics_filters[dimension] = var
+
+        ttk.Button(filter_frame, text="Apply Filter",
+                  command=self.display_filtered_analytics).grid(row=0, column=len(filter_specs) * 2, padx=5)
+
+        self.analytics_summary_label = ttk.Label(main_frame, text="", font=('Courier', 9), justify=tk.LEFT)
+        self.analytics_summary_label.pack(fill=tk.X, pady=5)
+
         # Canvas for plots
         self.viz_frame = ttk.Frame(main_frame)
         self.viz_frame.pack(fill=tk.BOTH, expand=True)
@@ -242,12 +307,8 @@ Note: Results are only available after the scholarship officer has processed all
             return
         
         try:
-            # Load results and find student by email - FIXED ENCODING
-            try:
-                results_df = pd.read_csv(self.results_filename, encoding='utf-8')
-            except UnicodeDecodeError:
-                # Fallback to Windows-1252 if UTF-8 fails
-                results_df = pd.read_csv(self.results_filename, encoding='windows-1252')
+            # Load results and find student by email
+            results_df = load_results(self.results_filename)
             
             if 'Email' not in results_df.columns:
                 messagebox.showerror("Error", "Results file doesn't contain email information.")
@@ -262,7 +323,8 @@ Note: Results are only available after the scholarship officer has processed all
                 return
             
             # Display the result
-            result = student_result.iloc[0]
+            # Later submissions get higher student numbers, so prefer the last match
+            result = student_result.iloc[-1]
             self.display_student_result_enhanced(result, email)
             
         except Exception as e:
@@ -272,219 +334,38 @@ Note: Results are only available after the scholarship officer has processed all
         """Display individual student result with enhanced user-friendly messages"""
         self.student_result_text.delete(1.0, tk.END)
         
-        # Header
-        self.student_result_text.insert(tk.END, "🎓 SCHOLARSHIP ELIGIBILITY RESULTS\n", 'header')
-        self.student_result_text.insert(tk.END, "=" * 50 + "\n\n")
-        self.student_result_text.insert(tk.END, f"📧 Email: {email}\n")
-        self.student_result_text.insert(tk.END, f"🆔 Student ID: {result['StudentID']}\n\n")
-        
-        # Decision with emoji
-        decision = result['Decision']
-        confidence = result['Confidence']
-        explanation = result['Explanation']
-        
-        self.student_result_text.insert(tk.END, "DECISION: ", 'label')
-        if 'Full Scholarship' in decision:
-            self.student_result_text.insert(tk.END, f"🟢 {decision}\n", 'success')
-        elif 'Partial Scholarship' in decision:
-            self.student_result_text.insert(tk.END, f"🟡 {decision}\n", 'partial')
-        elif 'Priority Candidate' in decision:
-            self.student_result_text.insert(tk.END, f"🟠 {decision}\n", 'priority')
-        elif 'Not Eligible' in decision:
-            self.student_result_text.insert(tk.END, f"🔴 {decision}\n", 'reject')
-        else:
-            self.student_result_text.insert(tk.END, f"{decision}\n")
-        
-        self.student_result_text.insert(tk.END, f"\n📊 CONFIDENCE SCORE: {confidence:.2f}/1.00\n\n", 'label')
-        
-        # Enhanced Evaluation Details
-        self.student_result_text.insert(tk.END, "📋 EVALUATION BREAKDOWN:\n", 'label')
-        self.student_result_text.insert(tk.END, "────────────────────────\n")
-        
-        # Parse and display evaluation details in user-friendly format
-        eval_details = self.parse_evaluation_for_student(explanation)
-        for detail in eval_details:
-            self.student_result_text.insert(tk.END, f"• {detail}\n")
-        
-        self.student_result_text.insert(tk.END, "\n")
-        
-        # Enhanced messages based on decision
-        self.display_decision_guidance(decision, explanation, confidence)
+        # Same template as the bulk letters (it only reads the tier words of the explanation)
+        segments = letter_segments(email, result['StudentID'], result['Decision'],
+                                   result['Confidence'], result['Explanation'])
+        for text, style in segments:
+            if style:
+                self.student_result_text.insert(tk.END, text, style)
+            else:
+                self.student_result_text.insert(tk.END, text)
         
         # Configure text tags for styling
         self.configure_text_tags()
 
-    def parse_evaluation_for_student(self, explanation):
-        """Parse explanation into student-friendly bullet points"""
-        details = []
-        
-        try:
-            # Academic evaluation
-            if 'Academic:' in explanation:
-                acad_part = explanation.split('Academic: ')[1].split(' | ')[0]
-                tier_match = re.search(r'(\w+) \(([^)]+)\)', acad_part)
-                if tier_match:
-                    tier = self.get_friendly_tier(tier_match.group(1))
-                    details.append(f"📚 Academic Performance: {tier}")
-            
-            # Financial evaluation
-            if 'Financial:' in explanation:
-                fin_part = explanation.split('Financial: ')[1].split(' | ')[0]
-                level_match = re.search(r'(\w+) \(([^)]+)\)', fin_part)
-                if level_match:
-                    level = self.get_friendly_financial(level_match.group(1))
-                    details.append(f"💰 Financial Need: {level}")
-            
-            # Activities evaluation
-            if 'Activities:' in explanation:
-                act_part = explanation.split('Activities: ')[1].split(' | ')[0]
-                act_match = re.search(r'(\w+) \(([^)]+)\)', act_part)
-                if act_match:
-                    level = self.get_friendly_activities(act_match.group(1))
-                    details.append(f"🏆 Co-curricular Activities: {level}")
-            
-            # Special considerations
-            if 'Special Factors:' in explanation:
-                spec_part = explanation.split('Special Factors: ')[1]
-                if spec_part and spec_part != '[]':
-                    details.append(f"🎯 Special Circumstances: Considered in evaluation")
-                    
-        except Exception:
-            details = ["Evaluation details available in full report"]
-        
-        return details
-
-    def display_decision_guidance(self, decision, explanation, confidence):
-        """Display appropriate guidance based on decision"""
-        if 'Full Scholarship' in decision:
-            self.student_result_text.insert(tk.END, 
-                "🎉 CONGRATULATIONS!\n\n"
-                "You have been awarded a Full Scholarship based on your outstanding application.\n\n"
-                "📅 Next Steps:\n"
-                "• Official offer letter will be sent to your email within 3 working days\n"
-                "• Review and accept the offer through the student portal\n"
-                "• Complete any required documentation\n"
-                "• Contact scholarship office for any questions\n\n"
-                "💡 This scholarship covers tuition fees and provides a living allowance.", 'success_msg')
-                
-        elif 'Partial Scholarship' in decision:
-            self.student_result_text.insert(tk.END,
-                "✅ SCHOLARSHIP AWARDED!\n\n"
-                "You have been selected for a Partial Scholarship.\n\n"
-                "📅 Next Steps:\n"
-                "• Scholarship details will be emailed to you\n"
-                "• Review the terms and coverage amount\n"
-                "• Accept the offer within 14 days\n"
-                "• Consider additional financial aid options if needed\n\n"
-                "💡 Partial scholarships significantly reduce your educational expenses.", 'partial_msg')
-                
-        elif 'Priority Candidate' in decision:
-            self.student_result_text.insert(tk.END,
-                "📋 UNDER SPECIAL CONSIDERATION\n\n"
-                "Your application has been marked for priority review.\n\n"
-                "📅 What to Expect:\n"
-                "• Committee will review your application further\n"
-                "• You may be contacted for additional information\n"
-                "• Final decision within 7-10 working days\n"
-                "• Continue checking your email for updates\n\n"
-                "💡 Your unique circumstances are being carefully considered.", 'priority_msg')
-                
-        elif 'Not Eligible - Basic Requirements' in decision:
-            self.student_result_text.insert(tk.END,
-                "❌ BASIC ELIGIBILITY NOT MET\n\n"
-                "You do not meet the basic eligibility criteria for this scholarship.\n\n", 'reject_msg')
-            
-            # Show specific basic requirements
-            self.student_result_text.insert(tk.END, "Basic Eligibility Requirements:\n", 'label')
-            requirements = [
-                "• Must be a Malaysian citizen",
-                "• Must have no disciplinary record",
-                "• Must provide data consent for processing"
-            ]
-            for req in requirements:
-                self.student_result_text.insert(tk.END, f"• {req}\n")
-                
-            self.student_result_text.insert(tk.END, 
-                "\n💡 Unfortunately, you cannot be considered for this scholarship due to the above requirements.\n", 'reject_msg')
-                
-        elif 'Not Eligible' in decision:
-            # Provide specific feedback based on the explanation
-            feedback = self.generate_improvement_feedback(explanation)
-            self.student_result_text.insert(tk.END,
-                "💡 APPLICATION REVIEW COMPLETE\n\n"
-                "While you meet basic requirements, your application was not selected this time.\n\n"
-                "📊 Areas for Improvement:\n", 'reject_msg')
-            
-            for item in feedback:
-                self.student_result_text.insert(tk.END, f"• {item}\n", 'reject_msg')
-                
-            self.student_result_text.insert(tk.END,
-                "\n🔄 Future Opportunities:\n"
-                "• Apply again next semester with improvements\n"
-                "• Explore other scholarship programs\n"
-                "• Visit Student Affairs for guidance\n"
-                "• Consider part-time campus employment\n\n"
-                "💡 Many successful students apply multiple times.", 'reject_msg')
-
-    def generate_improvement_feedback(self, explanation):
-        """Generate specific improvement suggestions based on evaluation"""
-        feedback = []
-        
-        if 'tier3' in explanation or 'tier4' in explanation:
-            feedback.append("Focus on improving your academic performance (aim for CGPA 3.5+)")
-        
-        if 'minimal' in explanation or 'low' in explanation:
-            feedback.append("Limited financial need was a factor in this evaluation")
-        
-        if 'poor' in explanation or 'basic' in explanation:
-            feedback.append("Increase participation in co-curricular activities")
-        
-        if 'moderate' in explanation:
-            feedback.append("Consider taking on leadership roles in student organizations")
-        
-        if not feedback:
-            feedback.append("Competition was high this semester - consider reapplying")
-        
-        return feedback
-
     def get_friendly_tier(self, tier):
         """Convert academic tier to friendly name"""
-        tier_map = {
-            'tier1': 'Excellent', 'tier2': 'Good', 
-            'tier3': 'Average', 'tier4': 'Below Average'
-        }
-        return tier_map.get(tier, tier)
+        return FRIENDLY_TIERS.get(tier, tier)
 
     def get_friendly_financial(self, level):
         """Convert financial level to friendly name"""
-        level_map = {
-            'urgent': 'Critical Need', 'high': 'High Need',
-            'medium': 'Moderate Need', 'low': 'Low Need',
-            'minimal': 'Minimal Need'
-        }
-        return level_map.get(level, level)
+        return FRIENDLY_FINANCIAL.get(level, level)
 
     def get_friendly_activities(self, level):
         """Convert activity level to friendly name"""
-        level_map = {
-            'outstanding': 'Outstanding', 'strong': 'Strong',
-            'moderate': 'Moderate', 'basic': 'Basic',
-            'poor': 'Limited'
-        }
-        return level_map.get(level, level)
+        return FRIENDLY_ACTIVITIES.get(level, level)
 
     def configure_text_tags(self):
         """Configure text styling tags"""
-        self.student_result_text.tag_configure('header', font=('Arial', 14, 'bold'), foreground='#2c3e50')
-        self.student_result_text.tag_configure('label', font=('Arial', 11, 'bold'), foreground='#34495e')
-        self.student_result_text.tag_configure('success', font=('Arial', 12, 'bold'), foreground='#27ae60')
-        self.student_result_text.tag_configure('partial', font=('Arial', 12, 'bold'), foreground='#f39c12')
-        self.student_result_text.tag_configure('priority', font=('Arial', 12, 'bold'), foreground='#e67e22')
-        self.student_result_text.tag_configure('reject', font=('Arial', 12, 'bold'), foreground='#e74c3c')
-        self.student_result_text.tag_configure('success_msg', foreground='#27ae60')
-        self.student_result_text.tag_configure('partial_msg', foreground='#f39c12')
-        self.student_result_text.tag_configure('priority_msg', foreground='#e67e22')
-        self.student_result_text.tag_configure('reject_msg', foreground='#e74c3c')
+        for tag, style in LETTER_STYLES.items():
+            if 'size' in style:
+                font = ('Arial', style['size'], 'bold') if style.get('bold') else ('Arial', style['size'])
+                self.student_result_text.tag_configure(tag, font=font, foreground=style['colour'])
+            else:
+                self.student_result_text.tag_configure(tag, foreground=style['colour'])
 
     def browse_file(self):
         """Browse for CSV file"""
@@ -508,6 +389,12 @@ Note: Results are only available after the scholarship officer has processed all
             messagebox.showerror("Error", f"Prolog file not found at:\n{self.prolog_filename}\n\nPlease make sure 'scholarship_rules.pl' is in the same folder as this application.")
             return
         
+        try:
+            timeout = float(self.prolog_timeout.get())
+        except ValueError:
+            messagebox.showerror("Error", "Prolog timeout must be a number of seconds.")
+            return
+        
         try:
             self.officer_output_text.delete(1.0, tk.END)
             self.officer_output_text.insert(tk.END, "🚀 Starting Prolog AI Processing...\n")
@@ -516,48 +403,16 @@ Note: Results are only available after the scholarship officer has processed all
             self.officer_output_text.insert(tk.END, f"Processing file: {filepath}\n\n")
             self.master.update()
             
-            # Convert Windows paths to Prolog compatible paths
-            prolog_filepath = filepath.replace('\\', '/')
-            prolog_script_path = self.prolog_filename.replace('\\', '/')
-            
-            # Create a complete Prolog script that includes everything
-            complete_script = f"""
-% Temporary processing script
-:- use_module(library(csv)).
-:- use_module(library(lists)).
-
-% Include the actual scholarship rules by reading the file
-:- ['{prolog_script_path}'].
-
-% Main execution
-main :-
-    process_scholarships('{prolog_filepath}'),
-    halt.
-
-% Ensure main is called
-:- initialization(main).
-"""
-            
-            # Write complete script to temporary file
-            temp_script_file = os.path.join(self.script_dir, "temp_complete_script.pl")
-            with open(temp_script_file, 'w', encoding='utf-8') as f:
-                f.write(complete_script)
-            
-            # Change to script directory for Prolog execution
-            original_cwd = os.getcwd()
-            os.chdir(self.script_dir)
-            
-            # Run Prolog with the temporary script
-            result = subprocess.run([
-                'swipl', '-q', '-f', 'temp_complete_script.pl'
-            ], capture_output=True, text=True, timeout=60, cwd=self.script_dir)
-            
-            # Change back to original directory
-            os.chdir(original_cwd)
-            
-            # Clean up temporary file
-            if os.path.exists(temp_script_file):
-                os.remove(temp_script_file)
+            result, report = run_prolog_batch(filepath, self.prolog_filename, self.script_dir,
+                                              self.duplicate_policy.get(), timeout=timeout)
+            if report['cached']:
+                self.officer_output_text.insert(tk.END, "⚡ Responses, rules and settings unchanged - results restored from the run cache\n")
+            elif report['resumed_from']:
+                self.officer_output_text.insert(tk.END, f"♻️ Resumed an interrupted run - {report['resumed_from']} applicants were already saved\n")
+            self.officer_output_text.insert(tk.END, describe_report(report) + "\n")
+            if len(report['duplicates']):
+                self.officer_output_text.insert(tk.END, f"   Duplicates listed in: {self.duplicate_review_filename}\n")
+            self.officer_output_text.insert(tk.END, "\n")
             
             if result.returncode == 0:
                 self.data_processed = True
@@ -581,11 +436,69 @@ main :-
                 
         except subprocess.TimeoutExpired:
             self.officer_output_text.insert(tk.END, "❌ PROCESSING TIMEOUT!\n")
-            messagebox.showerror("Error", "Processing took too long. Please try again.")
+            messagebox.showerror("Error", "Processing took too long. Run it again to continue from the last saved chunk, "
+                                          "or raise the Prolog timeout.")
+        except ProcessingInProgress:
+            self.officer_output_text.insert(tk.END, "⏳ Another run (e.g. the watch-folder daemon) is processing these files.\n")
+            messagebox.showwarning("Busy", "Another run is already processing. Please try again when it has finished.")
         except Exception as e:
             self.officer_output_text.insert(tk.END, f"❌ ERROR: {str(e)}\n")
             messagebox.showerror("Error", f"An error occurred: {str(e)}")
 
+    def export_decision_letters(self):
+        """Render a decision letter for every applicant into a zip archive"""
+        if not os.path.exists(self.results_filename):
+            messagebox.showwarning("Warning", "Please process data first or ensure results file exists.")
+            return
+        
+        out_path = filedialog.asksaveasfilename(
+            title="Save decision letters", initialdir=self.script_dir,
+            initialfile="scholarship_letters.zip", defaultextension=".zip",
+            filetypes=[("Zip archives", "*.zip")])
+        if not out_path:
+            return
+        
+        try:
+            self.officer_output_text.insert(tk.END, "\n✉️ Generating decision letters...\n")
+            self.master.update()
+            started = time.monotonic()
+            count = generate_letters(self.results_filename, out_path)
+            self.officer_output_text.insert(
+                tk.END, f"✅ {count} letters (HTML and text) written in {time.monotonic() - started:.1f}s\n"
+                        f"   Saved to: {out_path}\n")
+            messagebox.showinfo("Letters Generated", f"{count} decision letters saved to:\n{out_path}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not generate letters: {str(e)}")
+
+    def compare_runs(self):
+        """Compare the current results with an earlier run (by default the one they replaced)"""
+        if not os.path.exists(self.results_filename):
+            messagebox.showwarning("Warning", "Please process data first or ensure results file exists.")
+            return
+        
+        old_path = filedialog.askopenfilename(
+            title="Select earlier results to compare against", initialdir=self.script_dir,
+            initialfile=PREVIOUS_RESULTS_FILENAME, filetypes=[("CSV files", "*.csv")])
+        if not old_path:
+            return
+        
+        try:
+            diff = compare_result_files(old_path, self.results_filename)
+            diff_file = os.path.join(self.script_dir, "scholarship_results_diff.csv")
+            diff.to_csv(diff_file, index=False, encoding='utf-8')
+            
+            output = [f"Earlier run: {old_path}", f"Current run: {self.results_filename}", ""]
+            output += diff_summary(diff)
+            changes = diff[diff['Status'] != 'unchanged']
+            output.append(f"\n--- CHANGES ({len(changes)}) ---")
+            output += [describe_change(row) for row in changes.itertuples(index=False)]
+            output.append(f"\nFull comparison saved to: {diff_file}")
+            
+            self.officer_output_text.delete(1.0, tk.END)
+            self.officer_output_text.insert(tk.END, '\n'.join(output))
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not compare results: {str(e)}")
+
     def display_summary(self):
         """Display summary statistics"""
         if not os.path.exists(self.results_filename):
@@ -593,19 +506,20 @@ main :-
             return
         
         try:
-            try:
-                results_df = pd.read_csv(self.results_filename, encoding='utf-8')
-            except UnicodeDecodeError:
-                results_df = pd.read_csv(self.results_filename, encoding='windows-1252')
-            
+            cube = load_results_cube(self.results_filename)
+            counts = cube.groupby('Decision')['Count'].sum()
+
+            def count_where(predicate):
+                return int(sum(n for d, n in counts.items() if predicate(d)))
+
             summary = {
-                'total': len(results_df),
-                'full_count': sum(1 for d in results_df['Decision'] if 'Full Scholarship' in d),
-                'partial_count': sum(1 for d in results_df['Decision'] if 'Partial Scholarship' in d),
-                'priority_count': sum(1 for d in results_df['Decision'] if 'Priority Candidate' in d),
-                'not_eligible': sum(1 for d in results_df['Decision'] if 'Not Eligible' in d and 'Basic' not in d),
-                'basic_ineligible': sum(1 for d in results_df['Decision'] if 'Basic Requirements' in d),
-                'error_count': sum(1 for d in results_df['Decision'] if 'Error' in d),
+                'total': int(counts.sum()),
+                'full_count': count_where(lambda d: 'Full Scholarship' in d),
+                'partial_count': count_where(lambda d: 'Partial Scholarship' in d),
+                'priority_count': count_where(lambda d: 'Priority Candidate' in d),
+                'not_eligible': count_where(lambda d: 'Not Eligible' in d and 'Basic' not in d),
+                'basic_ineligible': count_where(lambda d: 'Basic Requirements' in d),
+                'error_count': count_where(lambda d: 'Error' in d),
             }
 
             output = ["🎓 SCHOLARSHIP EVALUATION SUMMARY", 
@@ -634,58 +548,348 @@ main :-
         except Exception as e:
             messagebox.showerror("Error", f"Could not load results: {str(e)}")
 
-    def display_detailed_enhanced(self):
-        """Display detailed results with user-friendly formatting"""
-        if not os.path.exists(self.results_filename):
-            messagebox.showwarning("Warning", "Please process data first.")
+    def open_what_if_simulator(self):
+        """Open the scenario simulator for rule thresholds and scores"""
+        filepath = self.responses_filepath.get()
+        if not filepath or not os.path.exists(filepath):
+            messagebox.showerror("Error", "Please select a valid student responses CSV file.")
             return
 
         try:
+            self.what_if_applicants = load_applicants(filepath)
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load student responses: {str(e)}")
+            return
+        self.what_if_scenarios = {}
+
+        window = tk.Toplevel(self.master)
+        window.title("What-If Simulator")
+        window.geometry("1100x750")
+
+        ttk.Label(window, text="Rule Thresholds & Scores (defaults from scholarship_rules.pl)",
+                 font=('Arial', 12, 'bold')).pack(pady=5)
+
+        params_frame = ttk.Frame(window, padding="10")
+        params_frame.pack(fill=tk.X)
+
+        self.what_if_entries = {}
+        columns = 3
+        for i, (key, default) in enumerate(DEFAULT_PARAMETERS.items()):
+            row, col = divmod(i, columns)
+            ttk.Label(params_frame, text=key, font=('Courier', 9)).grid(row=row, column=col * 2, sticky='w', padx=5)
+            entry = ttk.Entry(params_frame, width=8)
+            entry.insert(0, str(default))
+            entry.grid(row=row, column=col * 2 + 1, sticky='w', padx=5, pady=1)
+            self.what_if_entries[key] = entry
+
+        control_frame = ttk.Frame(window, padding="5")
+        control_frame.pack(fill=tk.X)
+        ttk.Label(control_frame, text="Scenario name:").pack(side=tk.LEFT, padx=5)
+        self.what_if_name = ttk.Entry(control_frame, width=25)
+        self.what_if_name.pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Run Scenario",
+                  command=self.run_what_if_scenario, style='Accent.TButton').pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Reset to Defaults",
+                  command=self.reset_what_if_entries).pack(side=tk.LEFT, padx=5)
+        ttk.Button(control_frame, text="Clear Scenarios",
+                  command=self.clear_what_if_scenarios).pack(side=tk.LEFT, padx=5)
+
+        self.what_if_output = tk.Text(window, height=12, wrap=tk.NONE, font=('Courier', 9))
+        self.what_if_output.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.show_what_if_comparison()
+
+    def reset_what_if_entries(self):
+        """Put every parameter back to its rules-file default"""
+        for key, entry in self.what_if_entries.items():
+            entry.delete(0, tk.END)
+            entry.insert(0, str(DEFAULT_PARAMETERS[key]))
+
+    def clear_what_if_scenarios(self):
+        self.what_if_scenarios = {}
+        self.show_what_if_comparison()
+
+    def run_what_if_scenario(self):
+        """Re-score the cohort with the changed parameters and add it to the comparison"""
+        overrides = {}
+        for key, entry in self.what_if_entries.items():
             try:
-                results_df = pd.read_csv(self.results_filename, encoding='utf-8')
-            except UnicodeDecodeError:
-                results_df = pd.read_csv(self.results_filename, encoding='windows-1252')
-            
-            output = ["🎓 DETAILED SCHOLARSHIP ANALYSIS (Grouped by Decision)\n"]
-            output.append("=" * 80)
-            
-            # Group by decision in specific order
-            decision_order = ['Full Scholarship', 'Partial Scholarship', 'Priority Candidate', 
-                            'Not Eligible', 'Not Eligible - Basic Requirements']
-            
-            for decision in decision_order:
-                group = results_df[results_df['Decision'] == decision]
-                if len(group) > 0:
-                    # Header with count
-                    if 'Full Scholarship' in decision:
-                        header = f"🌟 {decision.upper()} ({len(group)} Students)"
-                    elif 'Partial Scholarship' in decision:
-                        header = f"✅ {decision.upper()} ({len(group)} Students)"
-                    elif 'Priority Candidate' in decision:
-                        header = f"📋 {decision.upper()} ({len(group)} Students)"
-                    else:
-                        header = f"❌ {decision.upper()} ({len(group)} Students)"
-                    
-                    output.append(f"\n{header}")
-                    output.append("-" * 60)
-                    
-                    for _, row in group.iterrows():
-                        email = row['Email'] if 'Email' in row else 'N/A'
-                        conf = f"{row['Confidence']:.2f}"
-                        explanation = self.parse_explanation_for_display(row['Explanation'])
-                        
-                        output.append(f"\n📧 {email}")
-                        output.append(f"   Confidence: {conf}")
-                        output.append(f"   {explanation}")
-                    
-                    output.append("")  # Empty line between groups
+                value = float(entry.get())
+            except ValueError:
+                messagebox.showerror("Error", f"'{key}' must be a number.")
+                return
+            if value != DEFAULT_PARAMETERS[key]:
+                overrides[key] = value
+
+        name = self.what_if_name.get().strip() or f"Scenario {len(self.what_if_scenarios) + 1}"
+        self.what_if_scenarios[name] = overrides
+        self.show_what_if_comparison()
+
+    def show_what_if_comparison(self):
+        """Show decision counts of the baseline and all scenarios run so far"""
+        comparison = compare_scenarios(self.what_if_applicants, self.what_if_scenarios)
+        output = [f"🔬 WHAT-IF COMPARISON ({len(self.what_if_applicants)} applicants)", "=" * 60, "",
+                  comparison.to_string(), ""]
+        for name, overrides in self.what_if_scenarios.items():
+            changes = ', '.join(f"{k}={v}" for k, v in overrides.items()) or 'no changes'
+            output.append(f"{name}: {changes}")
+
+        self.what_if_output.delete(1.0, tk.END)
+        self.what_if_output.insert(tk.END, '\n'.join(output))
+
+    def open_award_allocation(self):
+        """Ask for the budget and award costs, then allocate funded awards"""
+        window = tk.Toplevel(self.master)
+        window.title("Budget-Constrained Award Allocation")
+
+        form = ttk.Frame(window, padding="15")
+        form.pack(fill=tk.BOTH, expand=True)
+
+        fields = [
+            ('budget', "Total budget (RM):", '500000'),
+            ('full_cost', "Full Scholarship cost (RM):", str(DEFAULT_AWARD_COSTS['Full Scholarship'])),
+            ('partial_cost', "Partial Scholarship cost (RM):", str(DEFAULT_AWARD_COSTS['Partial Scholarship'])),
+            ('waitlist', "Waitlist size:", '20'),
+        ]
+        entries = {}
+        for row, (key, label, default) in enumerate(fields):
+            ttk.Label(form, text=label).grid(row=row, column=0, sticky='w', padx=5, pady=5)
+            entry = ttk.Entry(form, width=15)
+            entry.insert(0, default)
+            entry.grid(row=row, column=1, sticky='w', padx=5, pady=5)
+            entries[key] = entry
+
+        ttk.Button(form, text="Allocate", style='Accent.TButton',
+                  command=lambda: self.run_award_allocation(window, entries)).grid(
+                      row=len(fields), column=0, columnspan=2, pady=10)
+
+    def run_award_allocation(self, window, entries):
+        """Rank the official awardees and write the funded list and waitlist"""
+        filepath = self.responses_filepath.get()
+        if not filepath or not os.path.exists(filepath):
+            messagebox.showerror("Error", "Please select a valid student responses CSV file.")
+            return
+        if not os.path.exists(self.results_filename):
+            messagebox.showwarning("Warning", "Please process data first or ensure results file exists.")
+            return
+
+        try:
+            budget = float(entries['budget'].get())
+            costs = {'Full Scholarship': float(entries['full_cost'].get()),
+                     'Partial Scholarship': float(entries['partial_cost'].get())}
+            waitlist_size = int(entries['waitlist'].get())
+        except ValueError:
+            messagebox.showerror("Error", "Budget, costs and waitlist size must be numbers.")
+            return
+
+        try:
+            scored = score_cohort(load_applicants(filepath, self.duplicate_policy.get()))
+            candidates = award_candidates(load_results(self.results_filename), scored)
+            funded, waitlist = allocate_awards(candidates, budget, costs, waitlist_size)
+
+            awards_file = os.path.join(self.script_dir, "scholarship_awards.csv")
+            waitlist_file = os.path.join(self.script_dir, "scholarship_waitlist.csv")
+            funded.to_csv(awards_file, index=False, encoding='utf-8')
+            waitlist.to_csv(waitlist_file, index=False, encoding='utf-8')
+
+            output = allocation_summary(funded, waitlist, budget)
+            output.append("\n--- FUNDED (by rank) ---")
+            for row in funded.itertuples(index=False):
+                output.append(f"#{row.Rank:<5} {row.Email:<40} {row.Decision:<22} score {row.Composite_Score:.1f}")
+            output.append("\n--- WAITLIST ---")
+            for row in waitlist.itertuples(index=False):
+                output.append(f"#{row.Rank:<5} {row.Email:<40} {row.Decision:<22} score {row.Composite_Score:.1f}")
+            output.append(f"\nFunded list saved to: {awards_file}")
+            output.append(f"Waitlist saved to: {waitlist_file}")
 
             self.officer_output_text.delete(1.0, tk.END)
             self.officer_output_text.insert(tk.END, '\n'.join(output))
-            
+            window.destroy()
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not allocate awards: {str(e)}")
+
+    def display_detailed_enhanced(self):
+        """Display detailed results in a paged, sortable and filterable table"""
+        if not os.path.exists(self.results_filename):
+            messagebox.showwarning("Warning", "Please process data first.")
+            return
+
+        try:
+            results_df = load_results(self.results_filename)
+
+            # Tier columns are extracted once (vectorised) so sorting and filtering
+            # never touch the per-row explanation parser
+            add_tier_columns(results_df)
+            self.detail_df = results_df
+            self.detail_view = results_df.index
+            self.detail_page = 0
+            self.detail_sort = (None, False)
+
+            self.open_detailed_window()
+            self.apply_detail_filters()
+
         except Exception as e:
             messagebox.showerror("Error", f"Could not load detailed results: {str(e)}")
 
+    def open_detailed_window(self):
+        """Create (or raise) the detailed results window"""
+        if getattr(self, 'detail_window', None) is not None and self.detail_window.winfo_exists():
+            self.detail_window.lift()
+            return
+
+        self.detail_window = tk.Toplevel(self.master)
+        self.detail_window.title("Detailed Scholarship Results")
+        self.detail_window.geometry("1150x650")
+
+        # Filter bar
+        filter_frame = ttk.LabelFrame(self.detail_window, text="Filters", padding="10")
+        filter_frame.pack(fill=tk.X, padx=10, pady=5)
+
+        self.detail_filters = {}
+        filter_specs = [
+            ("Decision", 'Decision', ['All', 'Full Scholarship', 'Partial Scholarship', 'Priority Candidate',
+                                      'Not Eligible', 'Not Eligible - Basic Requirements', 'Evaluation Error']),
+            ("Academic", 'Academic_Tier', ['All', 'tier1', 'tier2', 'tier3', 'tier4']),
+            ("Financial", 'Financial_Level', ['All', 'urgent', 'high', 'medium', 'low', 'minimal']),
+            ("Activities", 'Activity_Level', ['All', 'outstanding', 'strong', 'moderate', 'basic', 'poor']),
+        ]
+        for col, (label, column, values) in enumerate(filter_specs):
+            ttk.Label(filter_frame, text=f"{label}:").grid(row=0, column=col * 2, sticky='w', padx=5)
+            var = tk.StringVar(value='All')
+            ttk.Combobox(filter_frame, textvariable=var, values=values, state='readonly',
+                         width=28 if column == 'Decision' else 12).grid(row=0, column=col * 2 + 1, padx=5)
+            self.detail_filters[column] = var
+
+        ttk.Label(filter_frame, text="Email contains:").grid(row=1, column=0, sticky='w', padx=5, pady=5)
+        self.detail_search = ttk.Entry(filter_frame, width=30)
+        self.detail_search.grid(row=1, column=1, sticky='w', padx=5, pady=5)
+        ttk.Label(filter_frame, text="Min confidence:").grid(row=1, column=2, sticky='w', padx=5, pady=5)
+        self.detail_min_conf = ttk.Entry(filter_frame, width=8)
+        self.detail_min_conf.grid(row=1, column=3, sticky='w', padx=5, pady=5)
+        ttk.Button(filter_frame, text="Apply Filters",
+                  command=self.apply_detail_filters).grid(row=1, column=4, padx=5, pady=5)
+
+        # Results table - only the rows of the current page are ever inserted
+        table_frame = ttk.Frame(self.detail_window)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+
+        columns = [('Email', 240), ('Decision', 200), ('Confidence', 90),
+                   ('Academic_Tier', 110), ('Financial_Level', 110), ('Activity_Level', 110), ('Special_Factors', 200)]
+        self.detail_tree = ttk.Treeview(table_frame, columns=[c for c, _ in columns], show='headings')
+        for column, width in columns:
+            self.detail_tree.heading(column, text=column.replace('_', ' '),
+                                     command=lambda c=column: self.sort_detail_table(c))
+            self.detail_tree.column(column, width=width, anchor='w')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient="vertical", command=self.detail_tree.yview)
+        self.detail_tree.configure(yscrollcommand=scrollbar.set)
+        self.detail_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.detail_tree.bind('<<TreeviewSelect>>', self.show_detail_explanation)
+
+        # Paging controls
+        page_frame = ttk.Frame(self.detail_window)
+        page_frame.pack(fill=tk.X, padx=10, pady=5)
+        ttk.Button(page_frame, text="◀ Previous",
+                  command=lambda: self.change_detail_page(-1)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(page_frame, text="Next ▶",
+                  command=lambda: self.change_detail_page(1)).pack(side=tk.LEFT, padx=5)
+        self.detail_page_label = ttk.Label(page_frame, text="")
+        self.detail_page_label.pack(side=tk.LEFT, padx=10)
+
+        # Explanation of the selected applicant
+        self.detail_explanation = tk.Text(self.detail_window, height=4, wrap=tk.WORD, font=('Courier', 9))
+        self.detail_explanation.pack(fill=tk.X, padx=10, pady=5)
+
+    def apply_detail_filters(self):
+        """Filter the loaded results with vectorised masks and show the first page"""
+        df = self.detail_df
+        mask = pd.Series(True, index=df.index)
+
+        for column, var in self.detail_filters.items():
+            value = var.get()
+            if value != 'All':
+                mask &= df[column] == value
+
+        search = self.detail_search.get().strip().lower()
+        if search:
+            mask &= df['Email'].astype(str).str.lower().str.contains(search, regex=False)
+
+        min_conf = self.detail_min_conf.get().strip()
+        if min_conf:
+            try:
+                mask &= df['Confidence'] >= float(min_conf)
+            except ValueError:
+                messagebox.showerror("Error", "Minimum confidence must be a number.")
+                return
+
+        self.detail_view = df.index[mask.values]
+        self.detail_page = 0
+        self.sort_detail_view()
+        self.render_detail_page()
+
+    def sort_detail_table(self, column):
+        """Sort by a column, toggling the direction on repeated clicks"""
+        current, descending = self.detail_sort
+        self.detail_sort = (column, not descending if current == column else False)
+        self.detail_page = 0
+        self.sort_detail_view()
+        self.render_detail_page()
+
+    def sort_detail_view(self):
+        """Reorder the filtered row index according to the current sort column"""
+        column, descending = self.detail_sort
+        if column is None:
+            return
+        values = self.detail_df.loc[self.detail_view, column]
+        self.detail_view = values.sort_values(ascending=not descending, kind='stable', na_position='last').index
+
+    def change_detail_page(self, step):
+        """Move to the previous or next page"""
+        page_count = max(1, -(-len(self.detail_view) // self.DETAIL_PAGE_SIZE))
+        new_page = min(max(self.detail_page + step, 0), page_count - 1)
+        if new_page != self.detail_page:
+            self.detail_page = new_page
+            self.render_detail_page()
+
+    def render_detail_page(self):
+        """Insert only the rows of the current page into the table"""
+        self.detail_tree.delete(*self.detail_tree.get_children())
+
+        start = self.detail_page * self.DETAIL_PAGE_SIZE
+        page_index = self.detail_view[start:start + self.DETAIL_PAGE_SIZE]
+        page = self.detail_df.loc[page_index]
+
+        for row_id, row in zip(page_index, page.itertuples(index=False)):
+            special = row.Special_Factors if isinstance(row.Special_Factors, str) and row.Special_Factors != '[]' else ''
+            self.detail_tree.insert('', tk.END, iid=str(row_id), values=(
+                row.Email,
+                row.Decision,
+                f"{row.Confidence:.2f}",
+                self.get_friendly_tier(row.Academic_Tier) if isinstance(row.Academic_Tier, str) else '-',
+                self.get_friendly_financial(row.Financial_Level) if isinstance(row.Financial_Level, str) else '-',
+                self.get_friendly_activities(row.Activity_Level) if isinstance(row.Activity_Level, str) else '-',
+                special
+            ))
+
+        total = len(self.detail_view)
+        page_count = max(1, -(-total // self.DETAIL_PAGE_SIZE))
+        self.detail_page_label.config(
+            text=f"Page {self.detail_page + 1} of {page_count}  ({total} of {len(self.detail_df)} students)")
+        self.detail_explanation.delete(1.0, tk.END)
+
+    def show_detail_explanation(self, event=None):
+        """Format the explanation of the selected applicant on demand"""
+        selection = self.detail_tree.selection()
+        if not selection:
+            return
+        row = self.detail_df.loc[int(selection[0])]
+        self.detail_explanation.delete(1.0, tk.END)
+        self.detail_explanation.insert(tk.END, f"📧 {row['Email']}  ({row['StudentID']})\n")
+        # Deferred batch runs store only the tiers; the details come from that run's snapshot
+        explanation = full_explanation(row['Explanation'], row['Email'], self.results_filename)
+        self.detail_explanation.insert(tk.END, self.parse_explanation_for_display(explanation))
+
     def parse_explanation_for_display(self, explanation):
         """Parse the technical explanation into user-friendly format"""
         try:
@@ -694,29 +898,29 @@ main :-
             # Academic part
             if 'Academic:' in explanation:
                 acad_part = explanation.split('Academic: ')[1].split(' | ')[0]
-                tier_match = re.search(r'(\w+) \(([^)]+)\)', acad_part)
+                tier_match = re.search(r'(\w+)(?: \(([^)]+)\))?', acad_part)
                 if tier_match:
                     tier = tier_match.group(1)
                     details = tier_match.group(2)
-                    parts.append(f"📚 Academic: {self.get_friendly_tier(tier)} ({details})")
+                    parts.append(f"📚 Academic: {self.get_friendly_tier(tier)}" + (f" ({details})" if details else ""))
             
             # Financial part
             if 'Financial:' in explanation:
                 fin_part = explanation.split('Financial: ')[1].split(' | ')[0]
-                level_match = re.search(r'(\w+) \(([^)]+)\)', fin_part)
+                level_match = re.search(r'(\w+)(?: \(([^)]+)\))?', fin_part)
                 if level_match:
                     level = level_match.group(1)
                     details = level_match.group(2)
-                    parts.append(f"💰 Financial: {self.get_friendly_financial(level)} ({details})")
+                    parts.append(f"💰 Financial: {self.get_friendly_financial(level)}" + (f" ({details})" if details else ""))
             
             # Activities part
             if 'Activities:' in explanation:
                 act_part = explanation.split('Activities: ')[1].split(' | ')[0]
-                act_match = re.search(r'(\w+) \(([^)]+)\)', act_part)
+                act_match = re.search(r'(\w+)(?: \(([^)]+)\))?', act_part)
                 if act_match:
                     level = act_match.group(1)
                     details = act_match.group(2)
-                    parts.append(f"🏆 Activities: {self.get_friendly_activities(level)} ({details})")
+                    parts.append(f"🏆 Activities: {self.get_friendly_activities(level)}" + (f" ({details})" if details else ""))
             
             # Special factors
             if 'Special Factors:' in explanation:
@@ -729,8 +933,8 @@ main :-
         except Exception:
             return explanation  # Fallback to original if parsing fails
 
-    def generate_all_visualizations(self):
-        """Generate and display all visualizations - IMPROVED LAYOUT"""
+    def generate_all_visualizations(self, announce=True):
+        """Generate and display all visualizations for the drill-down segment - IMPROVED LAYOUT"""
         if not os.path.exists(self.results_filename):
             messagebox.showwarning("Warning", "Please process data first to generate visualizations.")
             return
@@ -740,16 +944,10 @@ main :-
             for widget in self.viz_frame.winfo_children():
                 widget.destroy()
 
-            try:
-                df = pd.read_csv(self.results_filename, encoding='utf-8')
-            except UnicodeDecodeError:
-                df = pd.read_csv(self.results_filename, encoding='windows-1252')
-        
-            # Create feature engineering for visualizations
-            df['Academic_Tier'] = df['Explanation'].str.extract(r'Academic: (\w+)')
-            df['Financial_Level'] = df['Explanation'].str.extract(r'Financial: (\w+)')
-            df['Activity_Level'] = df['Explanation'].str.extract(r'Activities: (\w+)')
-            df_filtered = df[df['Academic_Tier'].notna() & (df['Confidence'] > 0)].copy()
+            # Every chart is answered from the pre-aggregated cube for the same segment
+            cube = load_results_cube(self.results_filename)
+            filters = self.get_analytics_filters()
+            segment = ' + '.join(filters.values()) if filters else 'All students'
 
             # Create a scrollable frame for visualizations
             canvas = tk.Canvas(self.viz_frame)
@@ -772,10 +970,11 @@ main :-
             fig5, ax5 = plt.subplots(figsize=(12, 6))
 
             # Chart 1: Distribution of Decisions
-            decision_counts = df['Decision'].value_counts()
+            decision_stats = decision_summary(cube, filters)
+            decision_counts = decision_stats['Count']
             colors = ['#2ecc71', '#f39c12', '#e67e22', '#e74c3c', '#95a5a6', '#34495e']
             sns.barplot(y=decision_counts.index, x=decision_counts.values, ax=ax1, palette=colors[:len(decision_counts)])
-            ax1.set_title('1. Distribution of Scholarship Decisions', fontsize=14, fontweight='bold', pad=20)
+            ax1.set_title(f'1. Distribution of Scholarship Decisions ({segment})', fontsize=14, fontweight='bold', pad=20)
             ax1.set_xlabel('Number of Students', fontsize=12)
             ax1.set_ylabel('Decision', fontsize=12)
             ax1.tick_params(axis='y', labelsize=10)
@@ -784,29 +983,33 @@ main :-
             for i, v in enumerate(decision_counts.values):
                 ax1.text(v + 0.1, i, str(v), color='black', fontweight='bold', va='center')
 
-            # Chart 2: Confidence by Decision
-            sns.boxplot(x='Decision', y='Confidence', data=df, ax=ax2, palette='Set2')
-            ax2.set_title('2. Confidence Score by Decision', fontsize=14, fontweight='bold', pad=20)
+            # Chart 2: Confidence by Decision - min to max range and mean per decision
+            positions = list(range(len(decision_stats)))
+            ax2.vlines(positions, decision_stats['Confidence_Min'], decision_stats['Confidence_Max'],
+                       colors=sns.color_palette('Set2', len(decision_stats)), linewidth=14)
+            ax2.scatter(positions, decision_stats['Confidence_Mean'], color='black', zorder=3)
+            ax2.set_xticks(positions)
+            ax2.set_xticklabels(decision_stats.index)
+            ax2.set_title(f'2. Confidence Range by Decision ({segment})', fontsize=14, fontweight='bold', pad=20)
             ax2.set_xlabel('Decision', fontsize=12)
-            ax2.set_ylabel('Confidence Score', fontsize=12)
+            ax2.set_ylabel('Confidence Score (min – max)', fontsize=12)
             ax2.tick_params(axis='x', rotation=45, labelsize=10)
             ax2.tick_params(axis='y', labelsize=10)
             
             # Add mean value annotations
-            for i, decision in enumerate(df['Decision'].unique()):
-                mean_val = df[df['Decision'] == decision]['Confidence'].mean()
+            for i, mean_val in enumerate(decision_stats['Confidence_Mean']):
                 ax2.text(i, mean_val + 0.02, f'μ={mean_val:.2f}', 
                         ha='center', va='bottom', fontweight='bold', fontsize=9)
 
             # Chart 3: Decisions by Academic Tier
-            if not df_filtered.empty:
-                decision_by_tier = pd.crosstab(df_filtered['Academic_Tier'], df_filtered['Decision'])
+            decision_by_tier = cube_crosstab(cube, 'Academic_Tier', filters)
+            if not decision_by_tier.empty:
                 tier_order = ['tier1', 'tier2', 'tier3']
                 existing_tiers = [t for t in tier_order if t in decision_by_tier.index]
                 if existing_tiers:
                     decision_by_tier.reindex(existing_tiers, fill_value=0).plot(
                         kind='bar', stacked=True, ax=ax3, colormap='viridis')
-                    ax3.set_title('3. Decisions by Academic Tier', fontsize=14, fontweight='bold', pad=20)
+                    ax3.set_title(f'3. Decisions by Academic Tier ({segment})', fontsize=14, fontweight='bold', pad=20)
                     ax3.set_xlabel('Academic Tier', fontsize=12)
                     ax3.set_ylabel('Number of Students', fontsize=12)
                     ax3.legend(title='Decision', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
@@ -814,14 +1017,14 @@ main :-
                     ax3.tick_params(axis='y', labelsize=10)
 
             # Chart 4: Decisions by Financial Level
-            if not df_filtered.empty:
-                decision_by_financial = pd.crosstab(df_filtered['Financial_Level'], df_filtered['Decision'])
+            decision_by_financial = cube_crosstab(cube, 'Financial_Level', filters)
+            if not decision_by_financial.empty:
                 financial_order = ['minimal', 'low', 'medium', 'high', 'urgent']
                 existing_financial = [f for f in financial_order if f in decision_by_financial.index]
                 if existing_financial:
                     decision_by_financial.reindex(existing_financial, fill_value=0).plot(
                         kind='bar', stacked=True, ax=ax4, colormap='plasma')
-                    ax4.set_title('4. Decisions by Financial Level', fontsize=14, fontweight='bold', pad=20)
+                    ax4.set_title(f'4. Decisions by Financial Level ({segment})', fontsize=14, fontweight='bold', pad=20)
                     ax4.set_xlabel('Financial Level', fontsize=12)
                     ax4.set_ylabel('Number of Students', fontsize=12)
                     ax4.legend(title='Decision', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
@@ -829,14 +1032,14 @@ main :-
                     ax4.tick_params(axis='y', labelsize=10)
 
             # Chart 5: Decisions by Activity Level
-            if not df_filtered.empty:
-                decision_by_activity = pd.crosstab(df_filtered['Activity_Level'], df_filtered['Decision'])
+            decision_by_activity = cube_crosstab(cube, 'Activity_Level', filters)
+            if not decision_by_activity.empty:
                 activity_order = ['poor', 'basic', 'moderate', 'strong', 'outstanding']
                 existing_activity = [a for a in activity_order if a in decision_by_activity.index]
                 if existing_activity:
                     decision_by_activity.reindex(existing_activity, fill_value=0).plot(
                         kind='bar', stacked=True, ax=ax5, colormap='Set1')
-                    ax5.set_title('5. Decisions by Activity Level', fontsize=14, fontweight='bold', pad=20)
+                    ax5.set_title(f'5. Decisions by Activity Level ({segment})', fontsize=14, fontweight='bold', pad=20)
                     ax5.set_xlabel('Activity Level', fontsize=12)
                     ax5.set_ylabel('Number of Students', fontsize=12)
                     ax5.legend(title='Decision', bbox_to_anchor=(1.05, 1), loc='upper left', fontsize=9)
@@ -863,6 +1066,8 @@ main :-
                 canvas_fig = FigureCanvasTkAgg(fig, chart_frame)
                 canvas_fig.draw()
                 canvas_fig.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+                # The canvas keeps the figure; drop pyplot's reference so redraws don't pile up
+                plt.close(fig)
                 
                 # Add a separator between charts (except the last one)
                 if i < len(figures) - 1:
@@ -872,11 +1077,43 @@ main :-
             canvas.pack(side="left", fill="both", expand=True)
             scrollbar.pack(side="right", fill="y")
 
-            messagebox.showinfo("Success", "All 5 visualizations generated successfully!")
+            if announce:
+                messagebox.showinfo("Success", "All 5 visualizations generated successfully!")
 
         except Exception as e:
             messagebox.showerror("Error", f"Could not generate visualizations: {str(e)}")
 
+    def get_analytics_filters(self):
+        """Current drill-down filter selection as {dimension: value}"""
+        return {dimension: var.get() for dimension, var in self.analytics_filters.items()
+                if var.get() != 'All'}
+
+    def display_filtered_analytics(self):
+        """Show decision counts and confidence for the selected segment from the cube"""
+        if not os.path.exists(self.results_filename):
+            messagebox.showwarning("Warning", "Please process data first to generate analytics.")
+            return
+
+        try:
+            cube = load_results_cube(self.results_filename)
+            filters = self.get_analytics_filters()
+            summary = decision_summary(cube, filters)
+
+            segment = ' + '.join(filters.values()) if filters else 'All students'
+            lines = [f"Segment: {segment}  ({int(summary['Count'].sum())} students)"]
+            for decision, row in summary.iterrows():
+                lines.append(f"  {decision:<38}: {int(row['Count']):>6}   "
+                             f"confidence μ={row['Confidence_Mean']:.2f} "
+                             f"[{row['Confidence_Min']:.2f} – {row['Confidence_Max']:.2f}]")
+            self.analytics_summary_label.config(text='\n'.join(lines))
+
+        except Exception as e:
+            messagebox.showerror("Error", f"Could not load analytics: {str(e)}")
+            return
+
+        # Redraw the charts for the same segment so they never go stale
+        self.generate_all_visualizations(announce=False)
+
     def refresh_visualizations(self):
         """Refresh visualization data"""
         self.generate_all_visualizations()
@@ -887,4 +1124,6 @@ def main():
     root.mainloop()
 
 if __name__ == "__main__":
+    # Needed for the letter process pool in a PyInstaller bundle
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
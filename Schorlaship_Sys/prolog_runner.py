@@ -0,0 +1,246 @@
+import argparse
+import contextlib
+import filecmp
+import os
+import shutil
+import subprocess
+import pandas as pd
+
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows has no fcntl - lock the file with msvcrt instead
+    fcntl = None
+    import msvcrt
+
+from checkpoint import CHECKPOINT_DIRNAME, CHUNK_SIZE, merge_parts, read_checkpoint, resume_point, clear_checkpoint
+from data_loader import load_responses
+from explanations import details_path_for, write_explanation_details
+from ingest import prepare_responses
+from results_cube import cube_path_for, export_results_cube
+from run_cache import CACHE_DIRNAME, RunCache, run_key
+
+# --- Configuration ---
+RESULTS_FILENAME = "scholarship_results.csv"
+PREVIOUS_RESULTS_FILENAME = "scholarship_results_previous.csv"   # kept for "Compare Runs"
+DUPLICATE_REVIEW_FILENAME = "duplicate_submissions_review.csv"
+LOCK_FILENAME = "processing.lock"   # one run per work_dir (GUI and watcher share checkpoint/ and temp_*)
+PROLOG_TIMEOUT = 60
+# 'deferred' writes only the tiers in the Explanation column and leaves the
+# detailed text to explanations.full_explanation(); 'full' writes it all
+EXPLANATION_MODES = ('deferred', 'full')
+
+
+def build_processing_script(prolog_script_path, responses_path, explanation_mode='deferred',
+                            checkpoint_dir=CHECKPOINT_DIRNAME, input_key='', resume_from=0, parts_done=0,
+                            chunk_size=CHUNK_SIZE):
+    """Prolog script that loads the rules and runs process_scholarships_checkpointed/6 on the responses"""
+    # Convert Windows paths to Prolog compatible paths
+    prolog_filepath = responses_path.replace('\\', '/')
+    prolog_script_path = prolog_script_path.replace('\\', '/')
+    checkpoint_dir = checkpoint_dir.replace('\\', '/')
+
+    return f"""
+% Temporary processing script
+:- use_module(library(csv)).
+:- use_module(library(lists)).
+
+% Include the actual scholarship rules by reading the file
+:- ['{prolog_script_path}'].
+
+% Main execution
+main :-
+    set_explanation_mode({explanation_mode}),
+    process_scholarships_checkpointed('{prolog_filepath}', '{checkpoint_dir}', '{input_key}',
+                                      {resume_from}, {parts_done}, {chunk_size}),
+    halt.
+
+% Ensure main is called
+:- initialization(main).
+"""
+
+
+def engine_settings(duplicate_policy, explanation_mode='deferred'):
+    """Everything besides the two input files that can change what a run produces"""
+    return {
+        'duplicate_policy': duplicate_policy,
+        'script': build_processing_script('<rules>', '<responses>', explanation_mode, '<checkpoint>', '<key>'),
+    }
+
+
+def _restore_report(meta, review_path):
+    report = dict(meta['report'])
+    if os.path.exists(review_path):
+        report['duplicates'] = load_responses(review_path)
+    else:
+        report['duplicates'] = pd.DataFrame()
+    report['cached'] = True
+    report['resumed_from'] = 0
+    return report
+
+
+class ProcessingInProgress(RuntimeError):
+    """Another run (the GUI or the watcher) is already processing this work_dir"""
+
+
+@contextlib.contextmanager
+def work_dir_lock(work_dir):
+    """Exclusive lock on work_dir for the length of one run.
+
+    The lock is an OS lock on LOCK_FILENAME, so it is released when the file is closed
+    or the process dies and a crashed run never leaves a stale lock behind. Raises
+    ProcessingInProgress straight away if another run holds it.
+    """
+    lock_file = open(os.path.join(work_dir, LOCK_FILENAME), 'a+')
+    try:
+        try:
+            if fcntl is not None:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        except OSError:
+            raise ProcessingInProgress(f"Another run is already processing {work_dir}") from None
+        yield
+    finally:
+        lock_file.close()
+
+
+def run_swipl(script_filename, work_dir, timeout=PROLOG_TIMEOUT, on_started=None):
+    """Run a Prolog script like subprocess.run(); on_started(process) is called once swipl is running"""
+    with subprocess.Popen(['swipl', '-q', '-f', script_filename], stdout=subprocess.PIPE,
+                          stderr=subprocess.PIPE, text=True, cwd=work_dir) as process:
+        if on_started:
+            on_started(process)
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+    return subprocess.CompletedProcess(process.args, process.returncode, stdout, stderr)
+
+
+def _keep_previous_results(results_path, replacement_path, previous_path):
+    """Save the current results as the previous run just before replacement_path replaces them.
+
+    Identical results are left alone, so a repeated run or a cache hit of the same
+    inputs never overwrites the real previous run with a copy of the current one.
+    """
+    if os.path.exists(results_path) and not filecmp.cmp(results_path, replacement_path, shallow=False):
+        shutil.copyfile(results_path, previous_path)
+
+
+def run_prolog_batch(responses_path, prolog_path, work_dir, duplicate_policy='latest', timeout=PROLOG_TIMEOUT,
+                     use_cache=True, explanation_mode='deferred', chunk_size=CHUNK_SIZE, on_started=None):
+    """De-duplicate the responses, run swipl over them and pre-aggregate the results cube.
+
+    The results are written to scholarship_results.csv in work_dir. When a run or a
+    cache restore replaces them with different results, the old ones are kept as
+    scholarship_results_previous.csv. Returns
+    (subprocess result, duplicate report); report['cached'] is True when the outputs
+    were restored from the run cache because the responses, rules and settings were
+    all unchanged. explanation_mode is one of EXPLANATION_MODES.
+
+    swipl commits results in parts of chunk_size applicants under work_dir/checkpoint.
+    If a run is killed or times out, the next run over the same inputs resumes after
+    the last committed part (report['resumed_from'] applicants were already saved).
+    subprocess.TimeoutExpired propagates to the caller. Only one run at a time may use a
+    work_dir; a second one raises ProcessingInProgress.
+    """
+    with work_dir_lock(work_dir):
+        return _run_locked(responses_path, prolog_path, work_dir, duplicate_policy, timeout, use_cache,
+                           explanation_mode, chunk_size, on_started)
+
+
+def _run_locked(responses_path, prolog_path, work_dir, duplicate_policy, timeout, use_cache, explanation_mode,
+                chunk_size, on_started):
+    results_path = os.path.join(work_dir, RESULTS_FILENAME)
+    previous_path = os.path.join(work_dir, PREVIOUS_RESULTS_FILENAME)
+    review_path = os.path.join(work_dir, DUPLICATE_REVIEW_FILENAME)
+    checkpoint_dir = os.path.join(work_dir, CHECKPOINT_DIRNAME)
+    cache = RunCache(os.path.join(work_dir, CACHE_DIRNAME))
+
+    input_key = run_key(responses_path, prolog_path, engine_settings(duplicate_policy, explanation_mode))
+
+    if use_cache:
+        # A review file left over from another run must not survive a restore
+        if os.path.exists(review_path):
+            os.remove(review_path)
+        meta = cache.get(input_key)
+        if meta is not None:
+            _keep_previous_results(results_path, meta['files'][RESULTS_FILENAME], previous_path)
+            cache.restore(input_key, work_dir)
+            result = subprocess.CompletedProcess(['swipl'], 0, stdout=meta['stdout'], stderr='')
+            return result, _restore_report(meta, review_path)
+
+    temp_responses_file = os.path.join(work_dir, "temp_deduplicated_responses.csv")
+    temp_script_file = os.path.join(work_dir, "temp_complete_script.pl")
+    temp_results_file = os.path.join(work_dir, "temp_merged_results.csv")
+    temp_details_file = os.path.join(work_dir, "temp_explanation_details.csv")
+    resume_from, parts_done = resume_point(checkpoint_dir, input_key)
+
+    try:
+        # Collapse repeated submissions before they reach the Prolog engine
+        report = prepare_responses(responses_path, temp_responses_file, duplicate_policy, review_path=review_path)
+        # The answers quoted by full_explanation() must come from what this run evaluated
+        write_explanation_details(temp_responses_file, temp_details_file)
+
+        with open(temp_script_file, 'w', encoding='utf-8') as f:
+            f.write(build_processing_script(prolog_path, temp_responses_file, explanation_mode, checkpoint_dir,
+                                            input_key, resume_from, parts_done, chunk_size))
+
+        result = run_swipl('temp_complete_script.pl', work_dir, timeout, on_started)
+
+        report['cached'] = False
+        report['resumed_from'] = resume_from
+        if result.returncode == 0:
+            checkpoint = read_checkpoint(checkpoint_dir)
+            if checkpoint is None or checkpoint['key'] != input_key or not checkpoint['complete']:
+                # e.g. the responses could not be loaded: keep the previous results
+                result.returncode = 1
+                result.stderr += "\nProcessing stopped before every applicant was saved."
+                return result, report
+
+            merge_parts(checkpoint_dir, checkpoint['parts'], temp_results_file)
+            # Keep the last results so the new run can be compared against them
+            _keep_previous_results(results_path, temp_results_file, previous_path)
+            os.replace(temp_results_file, results_path)
+            os.replace(temp_details_file, details_path_for(results_path))
+            clear_checkpoint(checkpoint_dir)
+            # Pre-aggregate the results cube used by the summary and analytics
+            export_results_cube(results_path)
+            if use_cache:
+                # Results first, cube second: restore copies in this order
+                counts = {name: value for name, value in report.items()
+                          if name not in ('duplicates', 'cached', 'resumed_from')}
+                cache.put(input_key, [results_path, cube_path_for(results_path), details_path_for(results_path),
+                                      review_path],
+                          {'stdout': result.stdout, 'report': counts})
+    finally:
+        # Clean up temporary files
+        for temp_file in (temp_script_file, temp_responses_file, temp_results_file, temp_details_file):
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    return result, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Prolog batch over a responses file")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument('responses', nargs='?', default=os.path.join(script_dir, "student_responses.csv"))
+    parser.add_argument('--rules', default=os.path.join(script_dir, "scholarship_rules.pl"))
+    parser.add_argument('--work-dir', default=script_dir)
+    args = parser.parse_args()
+
+    result, report = run_prolog_batch(os.path.abspath(args.responses), os.path.abspath(args.rules),
+                                      os.path.abspath(args.work_dir))
+    print(result.stdout)
+    if result.returncode != 0:
+        print(result.stderr)
+    raise SystemExit(result.returncode)
+
+
+if __name__ == "__main__":
+    main()
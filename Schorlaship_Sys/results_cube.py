@@ -0,0 +1,127 @@
+import os
+import pandas as pd
+
+from data_loader import load_results
+
+# --- Configuration ---
+# Every applicant falls into exactly one cell of the cube. With 7 decisions,
+# 5 academic tiers, 6 financial levels, 4 income groups, 6 activity levels
+# and a handful of special flag combinations the cube stays at a few
+# thousand rows at most, whatever the cohort size.
+CUBE_DIMENSIONS = ['Decision', 'Academic_Tier', 'Financial_Level', 'Income_Group',
+                   'Activity_Level', 'Special_Flag']
+MISSING = 'n/a'
+
+
+TIER_PATTERNS = {
+    'Academic_Tier': r'Academic: (\w+)',
+    'Financial_Level': r'Financial: (\w+)',
+    'Income_Group': r'Income: ([BMT]\d0)',
+    'Activity_Level': r'Activities: (\w+)',
+    'Special_Factors': r'Special Factors: (.*)$',
+}
+
+
+def tier_columns(explanation):
+    """Tier/level columns parsed from the Explanation column, as categoricals"""
+    return {name: explanation.str.extract(pattern, expand=False).astype('category')
+            for name, pattern in TIER_PATTERNS.items()}
+
+
+def add_tier_columns(df):
+    """Add tier/level columns parsed from the Explanation column (vectorised)"""
+    for name, column in tier_columns(df['Explanation']).items():
+        df[name] = column
+    return df
+
+
+def _fill_missing(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        if MISSING not in series.cat.categories:
+            series = series.cat.add_categories(MISSING)
+    return series.fillna(MISSING)
+
+
+def cube_path_for(results_path):
+    """scholarship_results.csv -> scholarship_results_cube.csv"""
+    root, ext = os.path.splitext(results_path)
+    return f"{root}_cube{ext or '.csv'}"
+
+
+def build_results_cube(results_df):
+    """Aggregate per-applicant results into counts and confidence statistics per cell"""
+    df = results_df
+    if all(name in df.columns for name in TIER_PATTERNS):
+        tiers = df
+    else:
+        tiers = tier_columns(df['Explanation'])
+
+    special = tiers['Special_Factors'].astype(object).fillna('[]').str.strip('[]').str.replace(' ', '', regex=False)
+    keys = pd.DataFrame({
+        'Decision': _fill_missing(df['Decision']),
+        'Academic_Tier': _fill_missing(tiers['Academic_Tier']),
+        'Financial_Level': _fill_missing(tiers['Financial_Level']),
+        'Income_Group': _fill_missing(tiers['Income_Group']),
+        'Activity_Level': _fill_missing(tiers['Activity_Level']),
+        'Special_Flag': special.where(special != '', 'none'),
+    })
+    keys['Confidence'] = df['Confidence'].astype('float64')
+
+    cube = keys.groupby(CUBE_DIMENSIONS, sort=True, observed=True).agg(
+        Count=('Confidence', 'size'),
+        Confidence_Sum=('Confidence', 'sum'),
+        Confidence_Min=('Confidence', 'min'),
+        Confidence_Max=('Confidence', 'max'),
+    ).reset_index()
+    # Dimension values are plain strings in the small cube
+    cube[CUBE_DIMENSIONS] = cube[CUBE_DIMENSIONS].astype(str)
+    return cube
+
+
+def save_results_cube(cube, cube_path):
+    cube.to_csv(cube_path, index=False, encoding='utf-8')
+
+
+def export_results_cube(results_path):
+    """Build the cube from a results file and save it next to it"""
+    cube = build_results_cube(load_results(results_path))
+    save_results_cube(cube, cube_path_for(results_path))
+    return cube
+
+
+def load_results_cube(results_path):
+    """Load the cube next to a results file, rebuilding it if missing or stale"""
+    cube_path = cube_path_for(results_path)
+    if os.path.exists(cube_path) and os.path.getmtime(cube_path) >= os.path.getmtime(results_path):
+        return pd.read_csv(cube_path, dtype={d: str for d in CUBE_DIMENSIONS}, keep_default_na=False)
+    return export_results_cube(results_path)
+
+
+def filter_cube(cube, filters):
+    """Keep only cells matching {dimension: value}; 'All' or empty values are ignored"""
+    mask = pd.Series(True, index=cube.index)
+    for dimension, value in (filters or {}).items():
+        if value and value != 'All':
+            mask &= cube[dimension] == value
+    return cube[mask.values]
+
+
+def decision_summary(cube, filters=None):
+    """Count, mean/min/max confidence per decision for the filtered cells"""
+    cells = filter_cube(cube, filters)
+    summary = cells.groupby('Decision').agg(
+        Count=('Count', 'sum'),
+        Confidence_Sum=('Confidence_Sum', 'sum'),
+        Confidence_Min=('Confidence_Min', 'min'),
+        Confidence_Max=('Confidence_Max', 'max'),
+    )
+    summary['Confidence_Mean'] = summary['Confidence_Sum'] / summary['Count']
+    return summary.drop(columns='Confidence_Sum').sort_values('Count', ascending=False)
+
+
+def cube_crosstab(cube, dimension, filters=None):
+    """Equivalent of pd.crosstab(df[dimension], df['Decision']) answered from the cube"""
+    cells = filter_cube(cube, filters)
+    cells = cells[cells[dimension] != MISSING]
+    return cells.pivot_table(index=dimension, columns='Decision', values='Count',
+                             aggfunc='sum', fill_value=0)
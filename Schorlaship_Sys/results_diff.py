@@ -0,0 +1,155 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+from data_loader import load_results
+from ingest import normalise_email
+from results_cube import add_tier_columns
+
+# --- Configuration ---
+# Tier components compared between runs (parsed from the Explanation column)
+DIFF_COMPONENTS = ['Academic_Tier', 'Financial_Level', 'Income_Group', 'Activity_Level', 'Special_Factors']
+ABSENT = '(absent)'
+DIFF_STATUSES = ('changed', 'added', 'removed', 'unchanged')
+
+
+def _keyed(results):
+    """Results indexed by normalised email; a repeated email keeps its last (latest) result"""
+    results = add_tier_columns(results)
+    results = results.assign(Key=results['Email'].astype(str).map(normalise_email))
+    results = results[results['Key'] != '']
+    results = results.drop_duplicates('Key', keep='last')
+    columns = ['Key', 'Email', 'Decision', 'Confidence'] + DIFF_COMPONENTS
+    return results[columns].set_index('Key')
+
+
+def _as_text(series):
+    return series.astype(object).where(series.notna(), None)
+
+
+def _differs(before, after):
+    """Element-wise !=, where missing on both sides counts as equal"""
+    return ((before != after) & ~(before.isna() & after.isna())).to_numpy()
+
+
+def diff_results(old, new):
+    """Join two result sets on normalised email and describe what changed for each applicant.
+
+    pandas joins on a hash table of the keys, so this stays linear in the number of
+    applicants. Returns one row per email with old/new decision, confidence delta,
+    the tier components that changed and a Status of changed/added/removed/unchanged.
+    """
+    old, new = _keyed(old), _keyed(new)
+    joined = old.join(new, how='outer', lsuffix='_Old', rsuffix='_New')
+
+    in_old = joined['Decision_Old'].notna().to_numpy()
+    in_new = joined['Decision_New'].notna().to_numpy()
+
+    component_changed = {}
+    for component in DIFF_COMPONENTS:
+        before = _as_text(joined[f'{component}_Old'])
+        after = _as_text(joined[f'{component}_New'])
+        component_changed[component] = _differs(before, after) & in_old & in_new
+
+    changed_names = np.full(len(joined), '', dtype=object)
+    for component, mask in component_changed.items():
+        label = component.replace('_Tier', '').replace('_Level', '').replace('_Group', '')
+        changed_names[mask] = np.where(changed_names[mask] == '', label, changed_names[mask] + ', ' + label)
+
+    decision_old = _as_text(joined['Decision_Old'])
+    decision_new = _as_text(joined['Decision_New'])
+    confidence_old = joined['Confidence_Old'].astype('float64')
+    confidence_new = joined['Confidence_New'].astype('float64')
+    decision_changed = _differs(decision_old, decision_new) & in_old & in_new
+    any_change = (decision_changed | (changed_names != '')
+                  | ~np.isclose(confidence_old, confidence_new, equal_nan=True))
+
+    status = np.select([~in_old, ~in_new, any_change], ['added', 'removed', 'changed'], default='unchanged')
+
+    diff = pd.DataFrame({
+        'Email': joined['Email_New'].combine_first(joined['Email_Old']).astype(str),
+        'Status': pd.Categorical(status, categories=DIFF_STATUSES),
+        'Decision_Old': decision_old.fillna(ABSENT),
+        'Decision_New': decision_new.fillna(ABSENT),
+        'Decision_Changed': decision_changed,
+        'Confidence_Old': confidence_old,
+        'Confidence_New': confidence_new,
+        'Confidence_Delta': confidence_new - confidence_old,
+        'Changed_Components': changed_names,
+    })
+    for component in DIFF_COMPONENTS:
+        diff[f'{component}_Old'] = _as_text(joined[f'{component}_Old'])
+        diff[f'{component}_New'] = _as_text(joined[f'{component}_New'])
+    return diff.reset_index(drop=True)
+
+
+def transition_matrix(diff):
+    """Decision_Old x Decision_New counts; applicants only in one run show as (absent)"""
+    return pd.crosstab(diff['Decision_Old'], diff['Decision_New'],
+                       rownames=['Old \\ New'], colnames=[None])
+
+
+def diff_summary(diff):
+    """Lines for the officer output / console"""
+    counts = diff['Status'].value_counts()
+    changed = diff[diff['Status'] == 'changed']
+    lines = ["🔀 RESULTS COMPARISON", "=" * 40,
+             f"Applicants compared: {len(diff)}",
+             *(f"{status.capitalize():<12}: {int(counts.get(status, 0))}" for status in DIFF_STATUSES),
+             f"Decision changed: {int(diff['Decision_Changed'].sum())}", ""]
+
+    if len(changed):
+        delta = changed['Confidence_Delta']
+        lines.append(f"Confidence delta (changed applicants): mean {delta.mean():+.3f}, "
+                     f"min {delta.min():+.3f}, max {delta.max():+.3f}")
+        components = changed['Changed_Components'].str.split(', ').explode()
+        components = components[components != '']
+        if len(components):
+            lines.append("Components that changed: " + ', '.join(
+                f"{name} ({count})" for name, count in components.value_counts().items()))
+        lines.append("")
+
+    lines += ["Decision transitions:", transition_matrix(diff).to_string()]
+    return lines
+
+
+def describe_change(row):
+    """One line per changed applicant, e.g. 'a@utp.edu.my: Partial Scholarship → Full Scholarship'"""
+    if row.Status == 'added':
+        return f"{row.Email}: new applicant → {row.Decision_New}"
+    if row.Status == 'removed':
+        return f"{row.Email}: {row.Decision_Old} → no longer in results"
+    text = f"{row.Email}: {row.Decision_Old} → {row.Decision_New} (confidence {row.Confidence_Delta:+.2f})"
+    if row.Changed_Components:
+        text += f" [{row.Changed_Components}]"
+    return text
+
+
+def compare_result_files(old_path, new_path):
+    return diff_results(load_results(old_path), load_results(new_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the decisions of two scholarship_results.csv files")
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument('--out', help="write the per-applicant diff to this CSV")
+    parser.add_argument('--all', action='store_true', help="also list unchanged applicants")
+    args = parser.parse_args()
+
+    diff = compare_result_files(args.old, args.new)
+    print('\n'.join(diff_summary(diff)))
+
+    listed = diff if args.all else diff[diff['Status'] != 'unchanged']
+    if len(listed):
+        print("\n--- CHANGES ---")
+        for row in listed.itertuples(index=False):
+            print(describe_change(row))
+
+    if args.out:
+        diff.to_csv(args.out, index=False, encoding='utf-8')
+        print(f"\nDiff saved to: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
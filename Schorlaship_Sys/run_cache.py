@@ -0,0 +1,152 @@
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# --- Configuration ---
+CACHE_DIRNAME = "run_cache"
+CACHE_MAX_BYTES = 256 * 1024 * 1024   # least recently used runs are evicted beyond this
+CACHE_FORMAT = 2                      # bump when the cached file layout changes
+META_FILENAME = "meta.json"
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def _hash_file(digest, label, path):
+    digest.update(label.encode('utf-8') + b'\0')
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    digest.update(b'\0')
+
+
+def run_key(responses_path, prolog_path, settings):
+    """sha256 over the responses file, the rules file and the engine settings.
+
+    Only file contents count, not names or mtimes, so re-saving an unchanged export
+    still hits the cache while any edit to the answers, the rules or a setting misses.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"format={CACHE_FORMAT}\0".encode('utf-8'))
+    _hash_file(digest, 'responses', responses_path)
+    _hash_file(digest, 'rules', prolog_path)
+    digest.update(json.dumps(settings, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _dir_size(path):
+    return sum(entry.stat().st_size for entry in os.scandir(path) if entry.is_file())
+
+
+class RunCache:
+    """Content-addressed store of whole processing runs with size-bounded LRU eviction.
+
+    Each run lives in <cache_dir>/<key>/ holding the output files plus meta.json. The
+    mtime of meta.json records when the entry was last used.
+    """
+
+    def __init__(self, cache_dir, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+
+    def _entry_dir(self, key):
+        return os.path.join(self.cache_dir, key)
+
+    def get(self, key):
+        """meta dict of a cached run (with 'files' mapping names to cached paths), or None"""
+        meta_path = os.path.join(self._entry_dir(key), META_FILENAME)
+        try:
+            with open(meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        files = {name: os.path.join(self._entry_dir(key), name) for name in meta['files']}
+        if not all(os.path.exists(path) for path in files.values()):
+            return None
+        os.utime(meta_path)  # mark as recently used
+        return {**meta, 'files': files}
+
+    def put(self, key, files, meta):
+        """Store the given output files under key. files is a list of paths; missing ones are skipped."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = os.path.join(self.cache_dir, f".{key}.{os.getpid()}.tmp")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        stored = []
+        for path in files:
+            if os.path.exists(path):
+                shutil.copyfile(path, os.path.join(staging, os.path.basename(path)))
+                stored.append(os.path.basename(path))
+        with open(os.path.join(staging, META_FILENAME), 'w', encoding='utf-8') as f:
+            json.dump({**meta, 'files': stored, 'created': time.time()}, f)
+
+        # Publish atomically so a reader never sees half an entry
+        entry = self._entry_dir(key)
+        shutil.rmtree(entry, ignore_errors=True)
+        os.replace(staging, entry)
+        self.evict(keep=key)
+
+    def restore(self, key, work_dir):
+        """Copy a cached run's files into work_dir; returns its meta dict or None on a miss.
+
+        Files are copied in the order they were stored, so the cube keeps an mtime no
+        older than the results it was built from.
+        """
+        meta = self.get(key)
+        if meta is None:
+            return None
+        for name, path in meta['files'].items():
+            shutil.copyfile(path, os.path.join(work_dir, name))
+        return meta
+
+    def entries(self):
+        """[(key, size in bytes, last used)] for every complete entry"""
+        if not os.path.isdir(self.cache_dir):
+            return []
+        found = []
+        for entry in os.scandir(self.cache_dir):
+            meta_path = os.path.join(entry.path, META_FILENAME)
+            if entry.is_dir() and not entry.name.startswith('.') and os.path.exists(meta_path):
+                found.append((entry.name, _dir_size(entry.path), os.path.getmtime(meta_path)))
+        return found
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache fits in max_bytes"""
+        entries = sorted(self.entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for key, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or clear the processing run cache")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument('--cache-dir', default=os.path.join(script_dir, CACHE_DIRNAME))
+    parser.add_argument('--clear', action='store_true', help="delete every cached run")
+    args = parser.parse_args()
+
+    cache = RunCache(args.cache_dir)
+    if args.clear:
+        cache.clear()
+        print(f"🧹 Cleared {args.cache_dir}")
+        return
+
+    entries = sorted(cache.entries(), key=lambda e: e[2], reverse=True)
+    print(f"{len(entries)} cached runs, {sum(e[1] for e in entries) / 1e6:.1f} MB "
+          f"(limit {cache.max_bytes / 1e6:.0f} MB)")
+    for key, size, last_used in entries:
+        print(f"  {key[:16]}  {size / 1e3:8.1f} kB  last used {time.strftime('%Y-%m-%d %H:%M', time.localtime(last_used))}")
+
+
+if __name__ == "__main__":
+    main()
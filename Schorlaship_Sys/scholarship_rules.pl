@@ -3,6 +3,7 @@
 % Prolog AI Backend - FIXED BASIC REQUIREMENTS DETECTION
 % =============================================
 
+:- encoding(utf8).
 :- use_module(library(csv)).
 :- use_module(library(lists)).
 
@@ -11,6 +12,22 @@
 % -------------------------
 :- dynamic student/3.
 :- dynamic result/4.
+:- dynamic decision_inputs/2.
+:- dynamic explanation_cache/2.
+:- dynamic explanation_mode/1.
+
+% full:     every result row carries the complete explanation text
+% deferred: batch rows carry only the tiers (see write_compact_explanation/2);
+%           the text is built on demand by explanation_for/2
+explanation_mode(full).
+
+set_explanation_mode(Mode) :-
+    memberchk(Mode, [full, deferred]),
+    retractall(explanation_mode(_)),
+    assertz(explanation_mode(Mode)).
+
+% Rendered explanations kept for explanation_for/2
+explanation_cache_limit(64).
 
 % -------------------------
 % CSV DATA IMPORT - FIXED COLUMN MAPPING
@@ -19,7 +36,9 @@
 import_students_from_csv(Filename) :-
     format('Loading students from ~w...~n', [Filename]),
     retractall(student(_, _, _)),
-    (csv_read_file(Filename, Rows, [skip_header(true)]) ->
+    retractall(result(_, _, _, _)),
+    % The Python side always hands over a UTF-8 copy (see data_loader.py)
+    (csv_read_file(Filename, Rows, [skip_header(true), encoding(utf8)]) ->
         process_csv_rows(Rows, 1),
         format('✅ Successfully loaded students from CSV~n', [])
     ;
@@ -99,6 +118,12 @@ assert_student_fact(StudentID, Field, Value) :-
 % -------------------------
 
 determine_eligibility(StudentID, Decision, Confidence, Explanation) :-
+    determine_decision(StudentID, Decision, Confidence, Inputs),
+    explanation_from_inputs(StudentID, Inputs, Explanation).
+
+% Decision plus the compact inputs needed to explain it later:
+% tiers(Academic, Financial, IncomeGroup, Cocurricular, SpecialFlags) or basic_failure(Failures)
+determine_decision(StudentID, Decision, Confidence, Inputs) :-
     check_basic_requirements(StudentID, BasicResults),
     (BasicResults = [] ->
         % Student passed basic requirements, evaluate further
@@ -109,14 +134,28 @@ determine_eligibility(StudentID, Decision, Confidence, Explanation) :-
         calculate_composite_score(AcademicScore, FinancialScore, CocurricularScore, SpecialScore, TotalScore),
         apply_decision_rules(AcademicTier, FinancialTier, CocurricularTier, SpecialFlags, Decision),
         calculate_confidence(TotalScore, Decision, Confidence),
-        generate_success_explanation(StudentID, AcademicTier, FinancialTier, CocurricularTier, SpecialFlags, Decision, Explanation)
+        income_group(StudentID, IncomeGroup),
+        Inputs = tiers(AcademicTier, FinancialTier, IncomeGroup, CocurricularTier, SpecialFlags)
     ;
         % Student failed basic requirements
         Decision = 'Not Eligible - Basic Requirements',
         Confidence = 0.1,
-        generate_basic_failure_explanation(BasicResults, Explanation)
+        Inputs = basic_failure(BasicResults)
     ).
 
+explanation_from_inputs(StudentID, tiers(AcademicTier, FinancialTier, _, CocurricularTier, SpecialFlags), Explanation) :-
+    generate_success_explanation(StudentID, AcademicTier, FinancialTier, CocurricularTier, SpecialFlags, _, Explanation).
+explanation_from_inputs(_, basic_failure(BasicResults), Explanation) :-
+    generate_basic_failure_explanation(BasicResults, Explanation).
+explanation_from_inputs(_, error, 'Error processing student').
+
+% B40/M40/T20 as written at the start of the income answer
+income_group(StudentID, Group) :-
+    student(StudentID, household_income, Income),
+    member(Group, ['B40', 'M40', 'T20']),
+    sub_atom(Income, _, _, _, Group), !.
+income_group(_, unknown).
+
 % FIXED: More robust basic requirements checking
 check_basic_requirements(StudentID, FailedRequirements) :-
     findall(Failure, (
@@ -368,14 +407,28 @@ evaluate_all_students(Results) :-
 
 evaluate_student_list([], []).
 evaluate_student_list([StudentID|Rest], [result(StudentID, Decision, Confidence, Explanation)|Results]) :-
+    evaluate_student(StudentID, Decision, Confidence, Explanation),
+    evaluate_student_list(Rest, Results).
+
+% Evaluate one student; never fails
+evaluate_student(StudentID, Decision, Confidence, Explanation) :-
     (determine_eligibility(StudentID, Decision, Confidence, Explanation) ->
         true
     ;
         Decision = 'Evaluation Error',
         Confidence = 0.0,
         Explanation = 'Error processing student'
-    ),
-    evaluate_student_list(Rest, Results).
+    ).
+
+% Same without building the explanation; never fails
+evaluate_student_inputs(StudentID, Decision, Confidence, Inputs) :-
+    (determine_decision(StudentID, Decision, Confidence, Inputs) ->
+        true
+    ;
+        Decision = 'Evaluation Error',
+        Confidence = 0.0,
+        Inputs = error
+    ).
 
 % -------------------------
 % EMAIL-BASED LOOKUP
@@ -388,13 +441,52 @@ store_results :-
     forall(member(result(StudentID, Decision, Confidence, Explanation), Results),
            assertz(result(StudentID, Decision, Confidence, Explanation))).
 
+% Lookups need the result/4 table; batch runs stream results without it
+ensure_results_stored :-
+    (result(_, _, _, _) ->
+        true
+    ;
+        store_results
+    ).
+
 % Find result by email
 find_result_by_email(Email, StudentID, Decision, Confidence, Explanation) :-
+    ensure_results_stored,
     student(StudentID, email, Email),
-    result(StudentID, Decision, Confidence, Explanation).
+    result(StudentID, Decision, Confidence, Stored),
+    (Stored == deferred ->
+        explanation_for(StudentID, Explanation)
+    ;
+        Explanation = Stored
+    ).
+
+% Explanation text of a deferred-mode result, built on first use. The most
+% recently used explanations are cached, up to explanation_cache_limit/1.
+explanation_for(StudentID, Explanation) :-
+    (retract(explanation_cache(StudentID, Cached)) ->
+        % Move to the most recently used end
+        assertz(explanation_cache(StudentID, Cached)),
+        Explanation = Cached
+    ;
+        decision_inputs(StudentID, Inputs),
+        explanation_from_inputs(StudentID, Inputs, Explanation),
+        cache_explanation(StudentID, Explanation)
+    ).
+
+cache_explanation(StudentID, Explanation) :-
+    explanation_cache_limit(Limit),
+    aggregate_all(count, explanation_cache(_, _), Count),
+    (Count >= Limit ->
+        % The first clause is the least recently used
+        once(retract(explanation_cache(_, _)))
+    ;
+        true
+    ),
+    assertz(explanation_cache(StudentID, Explanation)).
 
 % Get all results with emails
 get_all_results_with_emails(Results) :-
+    ensure_results_stored,
     findall([StudentID, Email, Decision, Confidence, Explanation],
             (student(StudentID, email, Email),
              result(StudentID, Decision, Confidence, Explanation)),
@@ -404,22 +496,85 @@ get_all_results_with_emails(Results) :-
 % CSV EXPORT - FIXED ENCODING
 % -------------------------
 
+% Export from the stored result/4 table
 export_results_to_csv(Filename) :-
-    open(Filename, write, Stream, [encoding(utf8)]),
-    write(Stream, 'StudentID,Email,Decision,Confidence,Explanation'), nl(Stream),
+    ensure_results_stored,
+    open(Filename, write, Stream, [encoding(utf8), buffer(full)]),
+    write_results_header(Stream),
     forall((student(StudentID, email, Email),
             result(StudentID, Decision, Confidence, Explanation)),
-           (write(Stream, StudentID), write(Stream, ','),
-            write_q(Stream, Email), write(Stream, ','),
-            write_q(Stream, Decision), write(Stream, ','),
-            write(Stream, Confidence), write(Stream, ','),
-            write_q(Stream, Explanation), nl(Stream))),
+           write_result_row(Stream, StudentID, Email, Decision, Confidence, Explanation)),
     close(Stream).
 
-% Helper to write quoted strings for CSV
+% Streaming export: evaluate each student and write its row straight away, so no
+% results list or result/4 table is built. KeepResults = true also asserts
+% result/4 for a lookup session that follows.
+export_results_streaming(Filename, KeepResults) :-
+    explanation_mode(Mode),
+    retractall(result(_, _, _, _)),
+    retractall(decision_inputs(_, _)),
+    retractall(explanation_cache(_, _)),
+    setup_call_cleanup(
+        open(Filename, write, Stream, [encoding(utf8), buffer(full)]),
+        ( write_results_header(Stream),
+          forall(student(StudentID, email, Email),
+                 export_student(Mode, Stream, StudentID, Email, KeepResults))
+        ),
+        close(Stream)).
+
+export_student(full, Stream, StudentID, Email, KeepResults) :-
+    evaluate_student(StudentID, Decision, Confidence, Explanation),
+    write_result_row(Stream, StudentID, Email, Decision, Confidence, Explanation),
+    (KeepResults == true ->
+        assertz(result(StudentID, Decision, Confidence, Explanation))
+    ;
+        true
+    ).
+% Deferred: no detail lookups and no explanation atom in the hot path. Only a
+% lookup session (KeepResults = true) keeps the compact inputs (which reference
+% existing atoms) for explanation_for/2; a batch run asserts nothing
+export_student(deferred, Stream, StudentID, Email, KeepResults) :-
+    evaluate_student_inputs(StudentID, Decision, Confidence, Inputs),
+    write_result_fields(Stream, StudentID, Email, Decision, Confidence),
+    write_compact_explanation(Stream, Inputs), nl(Stream),
+    (KeepResults == true ->
+        assertz(decision_inputs(StudentID, Inputs)),
+        assertz(result(StudentID, Decision, Confidence, deferred))
+    ;
+        true
+    ).
+
+% Same layout as the full explanation minus the details in brackets, so the
+% Python side parses tiers from either. Written straight to the stream.
+write_compact_explanation(Stream, tiers(AcademicTier, FinancialTier, IncomeGroup, CocurricularTier, SpecialFlags)) :-
+    !,
+    format(Stream, '"Academic: ~w | Financial: ~w | Income: ~w | Activities: ~w | Special Factors: ~w"',
+           [AcademicTier, FinancialTier, IncomeGroup, CocurricularTier, SpecialFlags]).
+write_compact_explanation(Stream, Inputs) :-
+    explanation_from_inputs(_, Inputs, Explanation),
+    write_q(Stream, Explanation).
+
+write_results_header(Stream) :-
+    write(Stream, 'StudentID,Email,Decision,Confidence,Explanation'), nl(Stream).
+
+write_result_row(Stream, StudentID, Email, Decision, Confidence, Explanation) :-
+    write_result_fields(Stream, StudentID, Email, Decision, Confidence),
+    write_q(Stream, Explanation), nl(Stream).
+
+% Everything up to and including the comma before the explanation
+write_result_fields(Stream, StudentID, Email, Decision, Confidence) :-
+    write(Stream, StudentID), write(Stream, ','),
+    write_q(Stream, Email), write(Stream, ','),
+    write_q(Stream, Decision), write(Stream, ','),
+    write(Stream, Confidence), write(Stream, ',').
+
+% Helper to write a CSV field with RFC 4180 quoting: fields holding a comma,
+% quote or line break are quoted and embedded quotes are doubled
 write_q(Stream, Value) :-
     (contains_special_char(Value) ->
-        format(Stream, '"~w"', [Value])
+        atomic_list_concat(Parts, '"', Value),
+        atomic_list_concat(Parts, '""', Escaped),
+        format(Stream, '"~w"', [Escaped])
     ;
         write(Stream, Value)
     ).
@@ -430,7 +585,7 @@ contains_special_char(Value) :-
     ; sub_atom(Value, _, _, _, '"')
     ; sub_atom(Value, _, _, _, '\n')
     ; sub_atom(Value, _, _, _, '\r')
-    ).
+    ), !.
 
 % -------------------------
 % SYSTEM MANAGEMENT
@@ -446,22 +601,104 @@ show_loaded_students :-
 
 % Main processing function - accepts filename as argument
 process_scholarships(Filename) :-
+    process_scholarships(Filename, false).
+
+% KeepResults = true keeps result/4 in memory for student_lookup/1 afterwards
+process_scholarships(Filename, KeepResults) :-
     format('=== UTP SCHOLARSHIP SYSTEM ===~n~n'),
     format('Processing file: ~w~n', [Filename]),
     format('1. Loading students from CSV...~n'),
     (import_students_from_csv(Filename) ->
         format('2. Showing loaded students...~n'),
         show_loaded_students,
-        format('3. Evaluating all students...~n'),
-        store_results,
-        format('4. Exporting results to CSV...~n'),
-        export_results_to_csv('scholarship_results.csv'),
+        format('3. Evaluating students and exporting results to CSV...~n'),
+        export_results_streaming('scholarship_results.csv', KeepResults),
         format('~n✅ Processing completed successfully!~n'),
         format('   Results saved to: scholarship_results.csv~n')
     ;
         format('❌ Processing failed - could not load CSV file~n')
     ).
 
+% -------------------------
+% CHECKPOINTED BATCH PROCESSING
+% -------------------------
+
+% Like process_scholarships/1, but results are committed in part files of
+% ChunkSize applicants inside Dir. After each part a checkpoint records the
+% input Key and how many applicants are saved, so a run that is killed can be
+% restarted with ResumeFrom/PartsDone taken from the checkpoint and only the
+% remaining applicants are evaluated. prolog_runner.py reads the checkpoint and
+% joins the parts into scholarship_results.csv.
+process_scholarships_checkpointed(Filename, Dir, Key, ResumeFrom, PartsDone, ChunkSize) :-
+    format('=== UTP SCHOLARSHIP SYSTEM ===~n~n'),
+    format('Processing file: ~w~n', [Filename]),
+    format('1. Loading students from CSV...~n'),
+    (import_students_from_csv(Filename) ->
+        format('2. Showing loaded students...~n'),
+        show_loaded_students,
+        (ResumeFrom > 0 ->
+            format('3. Resuming after applicant ~w (~w chunks already saved)...~n', [ResumeFrom, PartsDone])
+        ;
+            format('3. Evaluating students and exporting results in chunks of ~w...~n', [ChunkSize])
+        ),
+        explanation_mode(Mode),
+        retractall(result(_, _, _, _)),
+        retractall(decision_inputs(_, _)),
+        retractall(explanation_cache(_, _)),
+        findall(StudentID-Email, student(StudentID, email, Email), Applicants),
+        skip_applicants(ResumeFrom, Applicants, Remaining),
+        export_chunks(Remaining, Mode, Dir, Key, ResumeFrom, PartsDone, ChunkSize),
+        format('~n✅ Processing completed successfully!~n')
+    ;
+        format('❌ Processing failed - could not load CSV file~n')
+    ).
+
+export_chunks([], _, Dir, Key, LastIndex, Parts, _) :-
+    write_checkpoint(Dir, Key, LastIndex, Parts, true).
+export_chunks([Applicant|Applicants], Mode, Dir, Key, LastIndex, Parts, ChunkSize) :-
+    take_applicants(ChunkSize, [Applicant|Applicants], Chunk, Rest),
+    Part is Parts + 1,
+    part_file(Dir, Part, PartFile),
+    atom_concat(PartFile, '.tmp', TempFile),
+    setup_call_cleanup(
+        open(TempFile, write, Stream, [encoding(utf8), buffer(full)]),
+        forall(member(StudentID-Email, Chunk),
+               export_student(Mode, Stream, StudentID, Email, false)),
+        close(Stream)),
+    % Commit: the part only gets its real name once it is complete
+    rename_file(TempFile, PartFile),
+    length(Chunk, Count),
+    NextIndex is LastIndex + Count,
+    write_checkpoint(Dir, Key, NextIndex, Part, false),
+    format('   Saved chunk ~w (~w applicants done)~n', [Part, NextIndex]),
+    export_chunks(Rest, Mode, Dir, Key, NextIndex, Part, ChunkSize).
+
+part_file(Dir, Part, PartFile) :-
+    format(atom(Name), 'part_~w.csv', [Part]),
+    directory_file_path(Dir, Name, PartFile).
+
+% Checkpoint file, replaced by rename so it is never seen half written
+write_checkpoint(Dir, Key, LastIndex, Parts, Complete) :-
+    directory_file_path(Dir, 'checkpoint.txt', File),
+    atom_concat(File, '.tmp', TempFile),
+    setup_call_cleanup(
+        open(TempFile, write, Stream, [encoding(utf8)]),
+        format(Stream, 'key=~w~nlast_index=~w~nparts=~w~ncomplete=~w~n', [Key, LastIndex, Parts, Complete]),
+        close(Stream)),
+    rename_file(TempFile, File).
+
+skip_applicants(0, Applicants, Applicants) :- !.
+skip_applicants(_, [], []) :- !.
+skip_applicants(N, [_|Applicants], Remaining) :-
+    N1 is N - 1,
+    skip_applicants(N1, Applicants, Remaining).
+
+take_applicants(0, Applicants, [], Applicants) :- !.
+take_applicants(_, [], [], []) :- !.
+take_applicants(N, [Applicant|Applicants], [Applicant|Chunk], Rest) :-
+    N1 is N - 1,
+    take_applicants(N1, Applicants, Chunk, Rest).
+
 % Student lookup function
 student_lookup(Email) :-
     (find_result_by_email(Email, StudentID, Decision, Confidence, Explanation) ->
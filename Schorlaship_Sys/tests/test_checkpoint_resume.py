@@ -0,0 +1,84 @@
+import os
+import shutil
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+from checkpoint import CHECKPOINT_DIRNAME, CHECKPOINT_FILENAME, read_checkpoint
+from data_loader import load_responses
+from ingest import EMAIL_COLUMN
+from prolog_runner import RESULTS_FILENAME, ProcessingInProgress, run_prolog_batch, work_dir_lock
+
+SCRIPT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESPONSES = os.path.join(SCRIPT_DIR, "student_responses.csv")
+RULES = os.path.join(SCRIPT_DIR, "scholarship_rules.pl")
+
+needs_swipl = pytest.mark.skipif(shutil.which('swipl') is None, reason="swipl is not on PATH")
+
+
+def kill_after_first_checkpoint(checkpoint_dir):
+    """on_started hook that kills swipl as soon as it has committed its first part"""
+    checkpoint_file = os.path.join(checkpoint_dir, CHECKPOINT_FILENAME)
+
+    def watch(process):
+        while process.poll() is None:
+            if os.path.exists(checkpoint_file):
+                process.kill()
+                return
+            time.sleep(0.01)
+
+    return lambda process: threading.Thread(target=watch, args=(process,), daemon=True).start()
+
+
+@pytest.fixture
+def large_responses(tmp_path):
+    """The shipped responses repeated 50 times with distinct emails, so a run can be interrupted"""
+    raw = load_responses(RESPONSES)
+    raw = raw[raw.iloc[:, EMAIL_COLUMN].str.strip() != '']
+    copies = []
+    for copy in range(50):
+        repeated = raw.copy()
+        repeated.iloc[:, EMAIL_COLUMN] = f"copy{copy}_" + repeated.iloc[:, EMAIL_COLUMN]
+        copies.append(repeated)
+    path = tmp_path / "responses.csv"
+    pd.concat(copies).to_csv(path, index=False, encoding='utf-8')
+    return str(path)
+
+
+@needs_swipl
+def test_killed_run_resumes_to_identical_results(tmp_path, large_responses):
+    uninterrupted_dir = tmp_path / "uninterrupted"
+    resumed_dir = tmp_path / "resumed"
+    uninterrupted_dir.mkdir()
+    resumed_dir.mkdir()
+
+    result, _ = run_prolog_batch(large_responses, RULES, str(uninterrupted_dir), timeout=600,
+                                 use_cache=False, chunk_size=100)
+    assert result.returncode == 0, result.stderr
+
+    checkpoint_dir = str(resumed_dir / CHECKPOINT_DIRNAME)
+    result, _ = run_prolog_batch(large_responses, RULES, str(resumed_dir), timeout=600, use_cache=False,
+                                 chunk_size=100, on_started=kill_after_first_checkpoint(checkpoint_dir))
+    checkpoint = read_checkpoint(checkpoint_dir)
+    assert result.returncode != 0
+    assert checkpoint is not None and not checkpoint['complete']
+    assert not (resumed_dir / RESULTS_FILENAME).exists()
+
+    result, report = run_prolog_batch(large_responses, RULES, str(resumed_dir), timeout=600,
+                                      use_cache=False, chunk_size=100)
+    assert result.returncode == 0, result.stderr
+    assert report['resumed_from'] == checkpoint['last_index'] > 0
+    assert ((resumed_dir / RESULTS_FILENAME).read_bytes()
+            == (uninterrupted_dir / RESULTS_FILENAME).read_bytes())
+    assert not os.path.exists(checkpoint_dir)
+
+
+def test_second_run_in_same_work_dir_is_refused(tmp_path):
+    with work_dir_lock(str(tmp_path)):
+        with pytest.raises(ProcessingInProgress):
+            run_prolog_batch(RESPONSES, RULES, str(tmp_path))
+    # Released again once the first run is done
+    with work_dir_lock(str(tmp_path)):
+        pass
@@ -1,13 +1,14 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
+from data_loader import load_results
 
 # --- Configuration ---
 file_path = 'scholarship_results.csv'
 
 # --- 1. Load Data and Feature Engineering ---
 try:
-    df = pd.read_csv(file_path)
+    df = load_results(file_path)
 except FileNotFoundError:
     print(f"Error: The file '{file_path}' was not found.")
     exit()
@@ -20,7 +21,7 @@ df['Activity_Level'] = df['Explanation'].str.extract(r'Activities: (\w+)')
 
 # Filter the data for visualization 3, 4, and 5: Keep only competitive applicants 
 # (i.e., those not marked as 'Not Eligible - Basic Requirements' which have Confidence > 0)
-df_filtered = df[df['Academic_Tier'].notna() & (df['Confidence'] > 0)].copy()
+df_filtered = df[df['Academic_Tier'].notna() & (df['Confidence'] > 0)]
 
 print("Data loaded and features extracted successfully.")
 
@@ -0,0 +1,193 @@
+import argparse
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from checkpoint import CHECKPOINT_DIRNAME, read_checkpoint
+from ingest import DUPLICATE_POLICIES, describe_report
+from prolog_runner import (EXPLANATION_MODES, PROLOG_TIMEOUT, RESULTS_FILENAME, ProcessingInProgress,
+                           run_prolog_batch)
+
+# --- Configuration ---
+POLL_INTERVAL = 1.0     # seconds between stat() calls on the responses file
+SETTLE_TIME = 3.0       # file must stay unchanged this long before a run is scheduled
+LOCK_RETRY_START = 2.0  # first wait when the GUI holds the work_dir lock; doubles up to LOCK_RETRY_MAX
+LOCK_RETRY_MAX = 60.0
+
+
+def log(message):
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+
+def file_signature(path):
+    """(mtime, size) of the file, or None while it does not exist"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def file_is_readable(path):
+    """A file that is still being written by the sync client often cannot be opened yet"""
+    try:
+        with open(path, 'rb') as f:
+            f.read(1)
+        return True
+    except OSError:
+        return False
+
+
+class CoalescingRunner:
+    """Runs a job on one worker thread; requests made while a run is in progress
+    collapse into a single follow-up run."""
+
+    def __init__(self, job):
+        self.job = job
+        self.pending = False
+        self.condition = threading.Condition()
+        self.worker = threading.Thread(target=self._work, daemon=True)
+        self.worker.start()
+
+    def request(self):
+        with self.condition:
+            self.pending = True
+            self.condition.notify()
+
+    def _work(self):
+        while True:
+            with self.condition:
+                while not self.pending:
+                    self.condition.wait()
+                self.pending = False
+            try:
+                self.job()
+            except Exception as e:
+                log(f"❌ ERROR: {e}")
+
+
+def run_when_unlocked(run):
+    """Call run(), backing off while another run (e.g. the GUI) holds the work_dir lock"""
+    delay = LOCK_RETRY_START
+    while True:
+        try:
+            return run()
+        except ProcessingInProgress:
+            if delay == LOCK_RETRY_START:
+                log("⏳ Another run (e.g. the GUI) is processing this folder - waiting for it to finish")
+            time.sleep(delay)
+            delay = min(delay * 2, LOCK_RETRY_MAX)
+
+
+def checkpoint_advanced(before, after):
+    """True if a timed-out run committed at least one more chunk than was saved before it"""
+    if after is None:
+        return False
+    return before is None or before['key'] != after['key'] or after['last_index'] > before['last_index']
+
+
+class ResponsesWatcher:
+    """Polls the responses file and schedules processing once a burst of writes has settled"""
+
+    def __init__(self, responses_path, on_change, poll_interval=POLL_INTERVAL, settle_time=SETTLE_TIME):
+        self.responses_path = responses_path
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.settle_time = settle_time
+        self.processed_signature = None
+
+    def watch(self, process_existing=True):
+        last_signature = file_signature(self.responses_path)
+        last_change = time.monotonic()
+        if not process_existing:
+            self.processed_signature = last_signature
+
+        while True:
+            signature = file_signature(self.responses_path)
+            now = time.monotonic()
+
+            if signature != last_signature:
+                # Still being written - restart the settle window
+                last_signature = signature
+                last_change = now
+            elif (signature is not None
+                  and signature != self.processed_signature
+                  and now - last_change >= self.settle_time
+                  and file_is_readable(self.responses_path)):
+                self.processed_signature = signature
+                self.on_change()
+
+            time.sleep(self.poll_interval)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Watch the Power Automate responses export and reprocess it when it changes")
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    parser.add_argument('responses', nargs='?', default=os.path.join(script_dir, "student_responses.csv"))
+    parser.add_argument('--rules', default=os.path.join(script_dir, "scholarship_rules.pl"))
+    parser.add_argument('--work-dir', default=script_dir, help="where scholarship_results.csv is written")
+    parser.add_argument('--duplicates', choices=DUPLICATE_POLICIES, default='latest')
+    parser.add_argument('--explanations', choices=EXPLANATION_MODES, default='deferred',
+                        help="'full' writes the detailed explanation text for every applicant")
+    parser.add_argument('--poll', type=float, default=POLL_INTERVAL)
+    parser.add_argument('--settle', type=float, default=SETTLE_TIME)
+    parser.add_argument('--timeout', type=float, default=PROLOG_TIMEOUT,
+                        help="seconds per swipl run; a run that times out resumes from its last saved chunk")
+    args = parser.parse_args()
+
+    responses_path = os.path.abspath(args.responses)
+    rules_path = os.path.abspath(args.rules)
+    work_dir = os.path.abspath(args.work_dir)
+    checkpoint_dir = os.path.join(work_dir, CHECKPOINT_DIRNAME)
+
+    def process():
+        log(f"🚀 Processing {responses_path}")
+        started = time.monotonic()
+        saved_before = read_checkpoint(checkpoint_dir)
+        try:
+            result, report = run_when_unlocked(lambda: run_prolog_batch(
+                responses_path, rules_path, work_dir, args.duplicates, timeout=args.timeout,
+                explanation_mode=args.explanations))
+        except subprocess.TimeoutExpired:
+            saved = read_checkpoint(checkpoint_dir)
+            if checkpoint_advanced(saved_before, saved):
+                # Queue the follow-up run now: it resumes from the checkpoint unless the file changed
+                log(f"⏱️ Run timed out after {args.timeout:g}s with {saved['last_index']} applicants saved "
+                    f"- resuming from the last saved chunk")
+                runner.request()
+            else:
+                log(f"❌ PROCESSING TIMEOUT! No chunk was saved within {args.timeout:g}s - "
+                    f"raise --timeout; the next change retries")
+            return
+        if report['cached']:
+            log("⚡ Inputs unchanged - results restored from the run cache")
+        elif report['resumed_from']:
+            log(f"♻️ Resumed an interrupted run after applicant {report['resumed_from']}")
+        log(describe_report(report))
+        if result.returncode == 0:
+            log(f"✅ Results refreshed in {time.monotonic() - started:.1f}s: "
+                f"{os.path.join(work_dir, RESULTS_FILENAME)}")
+        else:
+            log(f"❌ PROCESSING FAILED (return code {result.returncode})\n{result.stderr}")
+
+    # Only process on startup if the results are missing or older than the responses
+    results_path = os.path.join(work_dir, RESULTS_FILENAME)
+    process_existing = (not os.path.exists(results_path)
+                        or (os.path.exists(responses_path)
+                            and os.path.getmtime(results_path) < os.path.getmtime(responses_path)))
+
+    runner = CoalescingRunner(process)
+    watcher = ResponsesWatcher(responses_path, runner.request, args.poll, args.settle)
+    log(f"👀 Watching {responses_path} (poll {args.poll}s, settle {args.settle}s)")
+    try:
+        watcher.watch(process_existing)
+    except KeyboardInterrupt:
+        log("Stopped.")
+        sys.exit(0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import numpy as np
+import pandas as pd
+
+from data_loader import load_responses
+from ingest import deduplicate_responses
+
+# --- Configuration ---
+# Mirrors the scores and thresholds in scholarship_rules.pl. A scenario is a
+# dict of overrides for any of these keys; everything else keeps its default.
+DEFAULT_PARAMETERS = {
+    # cgpa_evaluation/3
+    'cgpa_excellent_score': 4.0,
+    'cgpa_good_score': 3.0,
+    'cgpa_average_score': 2.0,
+    'cgpa_weak_score': 1.0,
+    # credit_hours_evaluation/3
+    'credits_advanced_score': 2.0,
+    'credits_intermediate_score': 1.5,
+    'credits_beginner_score': 1.0,
+    'credits_early_score': 0.5,
+    # income_evaluation/3, dependents_evaluation/2, employment_evaluation/2, loan_evaluation/2
+    'income_b40_score': 4.0,
+    'income_m40_score': 2.0,
+    'income_t20_score': 0.0,
+    'dependents_7_plus_score': 3.0,
+    'dependents_5_6_score': 2.0,
+    'dependents_3_4_score': 1.0,
+    'dependents_other_score': 0.5,
+    'employment_none_score': 3.0,
+    'employment_one_score': 2.0,
+    'employment_other_score': 0.5,
+    'loan_yes_score': 2.0,
+    'loan_no_score': 0.0,
+    # determine_financial_tier/2 (lower bounds)
+    'financial_urgent_min': 8.0,
+    'financial_high_min': 5.0,
+    'financial_medium_min': 3.0,
+    'financial_low_min': 1.0,
+    # activity_evaluation/2, leadership_evaluation/2
+    'activity_highly_score': 3.0,
+    'activity_very_score': 2.0,
+    'activity_moderately_score': 1.5,
+    'activity_slightly_score': 1.0,
+    'activity_none_score': 0.0,
+    'leadership_yes_score': 2.0,
+    'leadership_no_score': 0.0,
+    # determine_cocurricular_tier/2 (lower bounds)
+    'cocurricular_outstanding_min': 4.5,
+    'cocurricular_strong_min': 3.0,
+    'cocurricular_moderate_min': 1.5,
+    'cocurricular_basic_min': 1.0,
+    # special_factor/3
+    'health_challenge_score': 3.0,
+    'financial_hardship_score': 2.0,
+    # calculate_confidence/3, adjust_confidence/3
+    'max_possible_score': 20.0,
+    'full_confidence_factor': 1.2,
+    'partial_confidence_factor': 1.1,
+    'priority_confidence_factor': 1.0,
+    'not_eligible_confidence': 0.2,
+    'basic_requirements_confidence': 0.1,
+    # Known engine bugs, modelled as they behave today; set to 1 to see the cohort with the fix
+    'enforce_basic_requirements': 0.0,   # check_basic_requirements/2 never reports a failure
+    'cocurricular_basic_tier': 0.0,      # the 'basic' clause of determine_cocurricular_tier/2 has a syntax error
+}
+
+# combine_academic_tiers/3: (cgpa tier, credit tier or None for any) -> academic tier
+DEFAULT_ACADEMIC_TIERS = {
+    ('excellent', None): 'tier1',
+    ('good', 'advanced'): 'tier1',
+    ('good', 'intermediate'): 'tier2',
+    ('good', 'beginner'): 'tier2',
+    ('good', 'early'): 'tier3',
+    ('average', None): 'tier3',
+    ('weak', None): 'tier4',
+}
+
+# apply_decision_rules/5 in clause order: (academic, financial, cocurricular,
+# requires health_challenge, decision). None matches anything; first match wins.
+DEFAULT_DECISION_RULES = [
+    ('tier1', 'urgent', 'outstanding', False, 'Full Scholarship'),
+    ('tier1', 'urgent', 'strong', False, 'Full Scholarship'),
+    ('tier1', 'high', 'outstanding', False, 'Full Scholarship'),
+    ('tier1', 'high', 'strong', True, 'Full Scholarship'),
+    ('tier1', 'medium', 'strong', False, 'Partial Scholarship'),
+    ('tier2', 'high', None, False, 'Partial Scholarship'),
+    ('tier2', 'medium', 'strong', False, 'Partial Scholarship'),
+    ('tier2', 'medium', 'moderate', False, 'Partial Scholarship'),
+    ('tier3', 'urgent', None, True, 'Priority Candidate'),
+    ('tier2', 'urgent', 'poor', True, 'Priority Candidate'),
+]
+
+# Column positions used by process_csv_row/2 (1-based there, 0-based here)
+RESPONSE_COLUMNS = {
+    'email': 3, 'citizenship': 6, 'muslim_status': 8, 'disciplinary_record': 11,
+    'cgpa': 24, 'credit_hours': 25, 'household_income': 28, 'dependents': 29,
+    'employment_status': 30, 'educational_loan': 31, 'activity_level': 32,
+    'leadership_positions': 33, 'health_challenges': 41, 'living_situation': 42, 'consent': 43,
+}
+
+DECISION_ORDER = ['Full Scholarship', 'Partial Scholarship', 'Priority Candidate', 'Not Eligible',
+                  'Not Eligible - Basic Requirements', 'Evaluation Error']
+
+
+def load_applicants(responses_path, duplicate_policy='latest'):
+    """Read the raw survey export into one row per applicant with named fields"""
+    raw = load_responses(responses_path)
+    raw, _ = deduplicate_responses(raw, duplicate_policy)
+    return applicants_from_responses(raw)
+
+
+def applicants_from_responses(raw):
+    """Select the evaluated fields from a raw responses frame by column position"""
+    applicants = pd.DataFrame({name: raw.iloc[:, pos] if pos < raw.shape[1] else ''
+                               for name, pos in RESPONSE_COLUMNS.items()})
+    applicants = applicants.fillna('').apply(lambda col: col.str.strip())
+    # Form answers repeat heavily, so store them as categoricals (codes + one copy of each answer)
+    for name in RESPONSE_COLUMNS:
+        if name != 'email':
+            applicants[name] = applicants[name].astype('category')
+    # Blank trailing rows in the export assert no facts in Prolog, so they are not applicants
+    return applicants[(applicants != '').any(axis=1)]
+
+
+def resolve_scenario(overrides=None):
+    """Merge scenario overrides onto the defaults, rejecting unknown keys"""
+    overrides = dict(overrides or {})
+    academic_tiers = {**DEFAULT_ACADEMIC_TIERS, **overrides.pop('academic_tiers', {})}
+    decision_rules = overrides.pop('decision_rules', DEFAULT_DECISION_RULES)
+
+    unknown = set(overrides) - set(DEFAULT_PARAMETERS)
+    if unknown:
+        raise KeyError(f"Unknown scenario parameter(s): {', '.join(sorted(unknown))}")
+
+    params = dict(DEFAULT_PARAMETERS)
+    params.update({key: float(value) for key, value in overrides.items()})
+    return params, academic_tiers, decision_rules
+
+
+def _contains_any(series, patterns):
+    mask = np.zeros(len(series), dtype=bool)
+    for pattern in patterns:
+        mask |= series.str.contains(pattern, regex=False).to_numpy()
+    return mask
+
+
+def _equals_any(series, values):
+    return series.isin(values).to_numpy()
+
+
+def _tier_from_score(score, bounds, labels, fallback):
+    """determine_*_tier: first bound the score reaches wins, otherwise the fallback label"""
+    return np.select([score >= bound for bound in bounds], labels, default=fallback)
+
+
+def score_cohort(applicants, overrides=None):
+    """Re-score every applicant with vectorised rules; returns tiers, scores, decision and confidence"""
+    p, academic_tiers, decision_rules = resolve_scenario(overrides)
+    a = applicants
+    present = {name: (a[name] != '').to_numpy() for name in RESPONSE_COLUMNS}
+
+    # Academic profile
+    cgpa_tier = np.select(
+        [_contains_any(a['cgpa'], ['3.50', '4.00']),
+         _contains_any(a['cgpa'], ['3.00', '3.49']),
+         _contains_any(a['cgpa'], ['2.50', '2.99'])],
+        ['excellent', 'good', 'average'], default='weak')
+    cgpa_score = np.select(
+        [cgpa_tier == 'excellent', cgpa_tier == 'good', cgpa_tier == 'average'],
+        [p['cgpa_excellent_score'], p['cgpa_good_score'], p['cgpa_average_score']],
+        default=p['cgpa_weak_score'])
+
+    credit_tier = np.select(
+        [_contains_any(a['credit_hours'], ['Above 90', 'Above90']),
+         _contains_any(a['credit_hours'], ['61–90', '61-90']),
+         _contains_any(a['credit_hours'], ['30–60', '30-60'])],
+        ['advanced', 'intermediate', 'beginner'], default='early')
+    credit_score = np.select(
+        [credit_tier == 'advanced', credit_tier == 'intermediate', credit_tier == 'beginner'],
+        [p['credits_advanced_score'], p['credits_intermediate_score'], p['credits_beginner_score']],
+        default=p['credits_early_score'])
+
+    academic_tier = np.full(len(a), 'tier4', dtype=object)
+    for (cgpa, credits), tier in reversed(list(academic_tiers.items())):
+        mask = cgpa_tier == cgpa
+        if credits is not None:
+            mask &= credit_tier == credits
+        academic_tier[mask] = tier
+    academic_score = cgpa_score + credit_score
+
+    # Financial need
+    is_b40 = _contains_any(a['household_income'], ['B40', 'b40'])
+    is_m40 = _contains_any(a['household_income'], ['M40', 'm40'])
+    income_score = np.select([is_b40, is_m40], [p['income_b40_score'], p['income_m40_score']],
+                             default=p['income_t20_score'])
+    dependents_score = np.select(
+        [_contains_any(a['dependents'], ['7 and above', '7+']),
+         _contains_any(a['dependents'], ['5–6', '5-6']),
+         _contains_any(a['dependents'], ['3–4', '3-4'])],
+        [p['dependents_7_plus_score'], p['dependents_5_6_score'], p['dependents_3_4_score']],
+        default=p['dependents_other_score'])
+    employment_score = np.select(
+        [_contains_any(a['employment_status'], ['None employed', 'None']),
+         _contains_any(a['employment_status'], ['One employed', 'One'])],
+        [p['employment_none_score'], p['employment_one_score']],
+        default=p['employment_other_score'])
+    loan_score = np.where(_equals_any(a['educational_loan'], ['Yes', 'YES']),
+                          p['loan_yes_score'], p['loan_no_score'])
+    financial_score = income_score + dependents_score + employment_score + loan_score
+    financial_tier = _tier_from_score(
+        financial_score,
+        [p['financial_urgent_min'], p['financial_high_min'], p['financial_medium_min'], p['financial_low_min']],
+        ['urgent', 'high', 'medium', 'low'], 'minimal')
+
+    # Co-curricular profile
+    activity_score = np.select(
+        [_contains_any(a['activity_level'], ['Highly']),
+         _contains_any(a['activity_level'], ['Very']),
+         _contains_any(a['activity_level'], ['Moderately']),
+         _contains_any(a['activity_level'], ['Slightly'])],
+        [p['activity_highly_score'], p['activity_very_score'], p['activity_moderately_score'],
+         p['activity_slightly_score']],
+        default=p['activity_none_score'])
+    leadership_score = np.where(_equals_any(a['leadership_positions'], ['Yes', 'YES']),
+                                p['leadership_yes_score'], p['leadership_no_score'])
+    cocurricular_score = activity_score + leadership_score
+    cocurricular_bounds = [p['cocurricular_outstanding_min'], p['cocurricular_strong_min'],
+                           p['cocurricular_moderate_min']]
+    cocurricular_labels = ['outstanding', 'strong', 'moderate']
+    if p['cocurricular_basic_tier']:
+        # SWI skips the broken clause, so today these scores fall through to 'poor'
+        cocurricular_bounds.append(p['cocurricular_basic_min'])
+        cocurricular_labels.append('basic')
+    cocurricular_tier = _tier_from_score(cocurricular_score, cocurricular_bounds, cocurricular_labels, 'poor')
+
+    # Special factors
+    health_challenge = _equals_any(a['health_challenges'], ['Yes', 'YES'])
+    financial_hardship = (a['living_situation'] == 'Off-campus').to_numpy() & is_b40
+    special_score = (np.where(health_challenge, p['health_challenge_score'], 0.0)
+                     + np.where(financial_hardship, p['financial_hardship_score'], 0.0))
+
+    composite_score = academic_score + financial_score + cocurricular_score + special_score
+
+    # Decision rules - evaluated in reverse so the earliest matching clause wins
+    decision = np.full(len(a), 'Not Eligible', dtype=object)
+    for academic, financial, cocurricular, needs_health, label in reversed(decision_rules):
+        mask = np.ones(len(a), dtype=bool)
+        if academic is not None:
+            mask &= academic_tier == academic
+        if financial is not None:
+            mask &= financial_tier == financial
+        if cocurricular is not None:
+            mask &= cocurricular_tier == cocurricular
+        if needs_health:
+            mask &= health_challenge
+        decision[mask] = label
+
+    base_confidence = composite_score / p['max_possible_score']
+    confidence = np.select(
+        [decision == 'Full Scholarship', decision == 'Partial Scholarship', decision == 'Priority Candidate'],
+        [np.minimum(1.0, base_confidence * p['full_confidence_factor']),
+         np.minimum(1.0, base_confidence * p['partial_confidence_factor']),
+         base_confidence * p['priority_confidence_factor']],
+        default=p['not_eligible_confidence'])
+
+    # Basic requirements override everything (check_basic_requirements/2); a field
+    # that was left blank is never asserted in Prolog, so it cannot fail the check.
+    # The engine's findall over a conjunction of if-thens never yields a failure, so
+    # this only applies when the fix is switched on.
+    failed_basic = (
+        (present['citizenship'] & ~_equals_any(a['citizenship'], ['Yes', 'YES', 'Malaysian', 'Yes, I agree']))
+        | (present['disciplinary_record'] & ~_equals_any(a['disciplinary_record'], ['No', 'NO']))
+        | (present['consent'] & ~_equals_any(a['consent'], ['Yes, I agree', 'Yes', 'YES']))
+    ) & bool(p['enforce_basic_requirements'])
+    # determine_eligibility/4 fails (-> 'Evaluation Error') when a scored field is missing
+    incomplete = ~np.logical_and.reduce([present[name] for name in (
+        'cgpa', 'credit_hours', 'household_income', 'dependents', 'employment_status',
+        'educational_loan', 'activity_level', 'leadership_positions')])
+
+    decision[incomplete] = 'Evaluation Error'
+    confidence = np.where(incomplete, 0.0, confidence)
+    decision[failed_basic] = 'Not Eligible - Basic Requirements'
+    confidence = np.where(failed_basic, p['basic_requirements_confidence'], confidence)
+
+    return pd.DataFrame({
+        'Email': a['email'].to_numpy(),
+        'Academic_Tier': academic_tier,
+        'Financial_Level': financial_tier,
+        'Activity_Level': cocurricular_tier,
+        'Academic_Score': academic_score,
+        'Financial_Score': financial_score,
+        'Cocurricular_Score': cocurricular_score,
+        'Special_Score': special_score,
+        'Composite_Score': composite_score,
+        'Decision': decision,
+        'Confidence': np.round(confidence, 4),
+    }, index=applicants.index)
+
+
+def decision_counts(scored):
+    counts = scored['Decision'].value_counts()
+    return counts.reindex(DECISION_ORDER, fill_value=0)
+
+
+def compare_scenarios(applicants, scenarios):
+    """Decision counts for the baseline and each named scenario, plus change vs baseline"""
+    table = {'Baseline': decision_counts(score_cohort(applicants))}
+    for name, overrides in scenarios.items():
+        table[name] = decision_counts(score_cohort(applicants, overrides))
+    comparison = pd.DataFrame(table)
+    for name in scenarios:
+        comparison[f"{name} Δ"] = comparison[name] - comparison['Baseline']
+    return comparison
+
+
+def parse_assignments(assignments):
+    """['cgpa_good_score=3.5', ...] -> {'cgpa_good_score': 3.5, ...}"""
+    overrides = {}
+    for item in assignments:
+        key, sep, value = item.partition('=')
+        if not sep:
+            raise ValueError(f"Expected key=value, got '{item}'")
+        overrides[key.strip()] = float(value)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-score the cohort under alternative rule thresholds")
+    parser.add_argument('responses', nargs='?', default='student_responses.csv')
+    parser.add_argument('--scenario', nargs='+', action='append', default=[], metavar='NAME KEY=VALUE',
+                        help="scenario name followed by parameter overrides, e.g. "
+                             "--scenario lenient financial_high_min=4 cocurricular_strong_min=2.5")
+    parser.add_argument('--list-parameters', action='store_true', help="show tunable parameters and defaults")
+    args = parser.parse_args()
+
+    if args.list_parameters:
+        for key, value in DEFAULT_PARAMETERS.items():
+            print(f"{key:<32} {value}")
+        return
+
+    applicants = load_applicants(args.responses)
+    scenarios = {spec[0]: parse_assignments(spec[1:]) for spec in args.scenario}
+    print(compare_scenarios(applicants, scenarios).to_string())
+
+
+if __name__ == "__main__":
+    main()